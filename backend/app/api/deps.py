@@ -1,14 +1,15 @@
 import httpx
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session
 
-from app.core.database import get_session
+from app.core.database import get_analytics_session, get_session
 from app.core.security import verify_token
 from app.models.user import User
 from app.repositories.cards import CardsRepo
 from app.repositories.history import HistoryRepo
-from app.repositories.reverso import HTTPReversoRepo
+from app.repositories.jobs import ImportJobsRepo
+from app.repositories.reverso import ReversoRepo, build_reverso_repo, http_client
 from app.repositories.schedule import ScheduleRepo
 from app.repositories.user import UsersRepo
 
@@ -20,12 +21,18 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     return UsersRepo().get_user_by_username(username)
 
 
+def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail='Admin access required')
+    return user
+
+
 def get_httpx_client() -> httpx.Client:
-    return httpx.Client()
+    return http_client
 
 
-def get_reverso_repo(client: httpx.Client = Depends(get_httpx_client)) -> HTTPReversoRepo:
-    return HTTPReversoRepo(client)
+def get_reverso_repo(client: httpx.Client = Depends(get_httpx_client)) -> ReversoRepo:
+    return build_reverso_repo(client)
 
 
 def get_cards_repo(db: Session = Depends(get_session)) -> CardsRepo:
@@ -38,3 +45,16 @@ def get_schedule_repo(db: Session = Depends(get_session)) -> ScheduleRepo:
 
 def get_history_repo(db: Session = Depends(get_session)) -> HistoryRepo:
     return HistoryRepo(db)
+
+
+def get_jobs_repo(db: Session = Depends(get_session)) -> ImportJobsRepo:
+    return ImportJobsRepo(db)
+
+
+# Репозитории для тяжёлых агрегатов /stats: отдельный движок только на чтение, не мешающий записи ответов
+def get_analytics_schedule_repo(db: Session = Depends(get_analytics_session)) -> ScheduleRepo:
+    return ScheduleRepo(db)
+
+
+def get_analytics_history_repo(db: Session = Depends(get_analytics_session)) -> HistoryRepo:
+    return HistoryRepo(db)
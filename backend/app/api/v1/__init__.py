@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from .auth import router as auth_router
 from .backup import router as backup_router
 from .cards import router as cards_router
+from .debug import router as debug_router
 from .stats import router as stats_router
 from .study import router as study_router
 
@@ -12,3 +13,4 @@ router.include_router(cards_router, prefix='/cards')
 router.include_router(study_router, prefix='/study')
 router.include_router(stats_router, prefix='/stats')
 router.include_router(backup_router, prefix='/backup')
+router.include_router(debug_router, prefix='/debug')
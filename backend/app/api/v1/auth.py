@@ -19,10 +19,10 @@ class Token(BaseModel):
 
 
 @router.post('/login', response_model=Token)
-def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
+async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
     try:
         logger.info(f'Попытка входа пользователя: {form_data.username}')
-        user = user_repo.auth_user(form_data.username, form_data.password)
+        user = await user_repo.auth_user(form_data.username, form_data.password)
         token = create_access_token(user.username)
         logger.info(f'Токен успешно создан для пользователя: {user.username}')
         return Token(access_token=token, token_type='bearer')
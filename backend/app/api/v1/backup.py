@@ -2,7 +2,7 @@ import csv
 import io
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_cards_repo, get_current_user, get_schedule_repo
@@ -12,6 +12,16 @@ from app.repositories.schedule import ScheduleRepo
 
 router = APIRouter()
 
+# Выгрузка отдаётся кусками по стольку строк, а не одной строкой на всю колоду
+_EXPORT_CHUNK_ROWS = 1000
+
+
+def _drain(output: io.StringIO) -> str:
+    chunk = output.getvalue()
+    output.seek(0)
+    output.truncate()
+    return chunk
+
 
 @router.get('/export')
 def export_backup(
@@ -20,36 +30,35 @@ def export_backup(
     schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
 ):
     """Экспортирует Schedule + Cards в CSV"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+    schedules = schedule_repo.get_all_schedules(user.username)
+    cards = cards_repo.get_user_card_rows(user.username)
 
-    # Schedule section
-    writer.writerow(['# SCHEDULE'])
-    writer.writerow(['id', 'username', 'card_id', 'ease', 'due', 'interval_min', 'status', 'created_at'])
+    def generate():
+        output = io.StringIO()
+        writer = csv.writer(output)
 
-    schedules = schedule_repo.get_all_schedules(user.username)
-    for schedule in schedules:
-        writer.writerow([
-            schedule.id,
-            schedule.username,
-            schedule.card_id,
-            schedule.ease,
-            schedule.due.isoformat() if schedule.due else '',
-            schedule.interval_min,
-            schedule.status.value,
-            schedule.created_at.isoformat(),
-        ])
-
-    # Cards section
-    writer.writerow([])
-    writer.writerow(['# CARDS'])
-    writer.writerow(['id', 'word', 'translation', 'definition', 'meta', 'pronunciation', 'example', 'example_translation', 'created_at'])
-
-    # Получаем все карточки пользователя
-    card_ids = [s.card_id for s in schedules]
-    for card_id in card_ids:
-        card = cards_repo.get_card(card_id)
-        if card:
+        # Schedule section
+        writer.writerow(['# SCHEDULE'])
+        writer.writerow(['id', 'username', 'card_id', 'ease', 'due', 'interval_min', 'status', 'created_at'])
+        for i, schedule in enumerate(schedules, 1):
+            writer.writerow([
+                schedule.id,
+                schedule.username,
+                schedule.card_id,
+                schedule.ease,
+                schedule.due.isoformat() if schedule.due else '',
+                schedule.interval_min,
+                schedule.status.value,
+                schedule.created_at.isoformat(),
+            ])
+            if i % _EXPORT_CHUNK_ROWS == 0:
+                yield _drain(output)
+
+        # Cards section
+        writer.writerow([])
+        writer.writerow(['# CARDS'])
+        writer.writerow(['id', 'word', 'translation', 'definition', 'meta', 'pronunciation', 'example', 'example_translation', 'created_at'])
+        for i, card in enumerate(cards, 1):
             writer.writerow([
                 card.id,
                 card.word,
@@ -61,10 +70,12 @@ def export_backup(
                 card.example_translation or '',
                 card.created_at.isoformat(),
             ])
+            if i % _EXPORT_CHUNK_ROWS == 0:
+                yield _drain(output)
+        yield _drain(output)
 
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate(),
         media_type='text/csv',
         headers={'Content-Disposition': 'attachment; filename=flips_backup.csv'}
     )
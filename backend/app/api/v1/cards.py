@@ -1,16 +1,26 @@
-from typing import Annotated
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from pydantic import BaseModel
 
-from app.api.deps import get_cards_repo, get_current_user, get_reverso_repo, get_schedule_repo
+from app.api.deps import get_cards_repo, get_current_user, get_jobs_repo, get_reverso_repo, get_schedule_repo
+from app.models.entities import Card, CardStatus, ImportJobStatus, ImportWordStatus, Schedule
 from app.models.user import User
 from app.repositories.cards import CardsRepo
-from app.repositories.reverso import HTTPReversoRepo
+from app.repositories.jobs import ImportJobsRepo
+from app.repositories.reverso import ReversoRepo, reverso_status
 from app.repositories.schedule import ScheduleRepo
+from app.services.import_jobs import submit_import_job
 
 router = APIRouter()
 
+# Сколько секунд клиент отдаёт карточку из своего кэша без перепроверки по ETag
+CARD_MAX_AGE = 3600
+
 
 class BulkCreateRequest(BaseModel):
     words: list[str]
@@ -21,13 +31,134 @@ class BulkCreateResponse(BaseModel):
     failed: list[str]
 
 
+class ImportJobCreated(BaseModel):
+    job_id: str
+
+
+class ImportWordProgress(BaseModel):
+    word: str
+    status: ImportWordStatus
+
+
+class ImportJobProgress(BaseModel):
+    id: str
+    status: ImportJobStatus
+    total: int
+    processed: int
+    words: list[ImportWordProgress]
+
+
+class ChangesResponse(BaseModel):
+    cursor: int
+    has_more: bool
+    schedules: list[Schedule]
+    cards: list[Card]
+    deleted: list[str]
+
+
+class SearchResponse(BaseModel):
+    cards: list[Card]
+    next_cursor: str | None
+
+
+class DeckEntry(BaseModel):
+    card: Card
+    status: CardStatus
+    ease: float
+    due: datetime | None
+    interval_min: int | None
+    added_at: datetime
+
+
+class DeckPage(BaseModel):
+    entries: list[DeckEntry]
+    next_cursor: str | None
+
+
+def _encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+    except Exception:
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+
+def _is_number(value: object) -> bool:
+    # bool — подкласс int, но в курсоре это всегда подделка
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _decode_search_cursor(cursor: str) -> tuple[float, str]:
+    """Курсор поиска — (ранг, id карточки); иначе сравнение кортежей в SQL падает или сравнивает не то."""
+    key = _decode_cursor(cursor)
+    if len(key) != 2 or not _is_number(key[0]) or not isinstance(key[1], str):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+    return float(key[0]), key[1]
+
+
+def _decode_deck_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Курсор списка колоды — (сортировка, значение, id расписания); даты хранятся в ISO-формате.
+    Тип значения проверяется по сортировке: иначе строка вместо ease дойдёт до сравнения кортежей в SQL.
+    """
+    key = _decode_cursor(cursor)
+    if len(key) != 3 or key[0] != sort or not isinstance(key[2], int) or isinstance(key[2], bool):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+    _, value, schedule_id = key
+    if sort == 'ease':
+        if not _is_number(value):
+            raise HTTPException(status_code=400, detail='Invalid cursor')
+        return float(value), schedule_id
+    try:
+        return datetime.fromisoformat(value), schedule_id
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail='Invalid cursor')
+
+
+@router.get('')
+def list_cards(
+    user: Annotated[User, Depends(get_current_user)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    sort: Literal['created', 'ease', 'due'] = 'created',
+    descending: bool = False,
+    status: CardStatus | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+) -> DeckPage:
+    """Колода пользователя постранично; для следующей страницы передайте next_cursor как cursor с теми же фильтрами."""
+    after = _decode_deck_cursor(cursor, sort) if cursor else None
+    rows = schedule_repo.get_deck_page(user.username, sort, descending, status, limit, after)
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        value = {'created': last.added_at, 'ease': last.ease, 'due': last.due}[sort]
+        next_cursor = _encode_cursor((sort, value if sort == 'ease' else value.isoformat(), last.schedule_id))
+    return DeckPage(
+        entries=[
+            DeckEntry(
+                card=Card(**row.card._asdict()),
+                status=row.status,
+                ease=row.ease,
+                due=row.due,
+                interval_min=row.interval_min,
+                added_at=row.added_at,
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.post('/create')
 def create_cards(
     word: str,
     user: Annotated[User, Depends(get_current_user)],
     cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
     schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
-    reverso: Annotated[HTTPReversoRepo, Depends(get_reverso_repo)],
+    reverso: Annotated[ReversoRepo, Depends(get_reverso_repo)],
 ) -> set[str]:
     if not (cards := reverso.get_cards(word)):
         raise HTTPException(status_code=404, detail='No cards found')
@@ -45,7 +176,7 @@ def bulk_create_cards(
     user: Annotated[User, Depends(get_current_user)],
     cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
     schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
-    reverso: Annotated[HTTPReversoRepo, Depends(get_reverso_repo)],
+    reverso: Annotated[ReversoRepo, Depends(get_reverso_repo)],
 ) -> BulkCreateResponse:
     results = BulkCreateResponse(added=[], failed=[])
 
@@ -68,3 +199,109 @@ def bulk_create_cards(
             results.failed.append(word)
 
     return results
+
+
+@router.post('/jobs')
+def create_import_job(
+    request: BulkCreateRequest,
+    user: Annotated[User, Depends(get_current_user)],
+    jobs_repo: Annotated[ImportJobsRepo, Depends(get_jobs_repo)],
+) -> ImportJobCreated:
+    """Ставит список слов в фоновый импорт и сразу возвращает id задания."""
+    words = [word.strip() for word in request.words if word.strip()]
+    if not words:
+        raise HTTPException(status_code=400, detail='No words to import')
+    job = jobs_repo.create_job(user.username, words)
+    submit_import_job(job.id)
+    return ImportJobCreated(job_id=job.id)
+
+
+@router.get('/jobs/{job_id}')
+def get_import_job(
+    job_id: str,
+    user: Annotated[User, Depends(get_current_user)],
+    jobs_repo: Annotated[ImportJobsRepo, Depends(get_jobs_repo)],
+) -> ImportJobProgress:
+    if not (job := jobs_repo.get_job(job_id)) or job.username != user.username:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return ImportJobProgress(
+        id=job.id,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        words=[ImportWordProgress(word=item.word, status=item.status) for item in jobs_repo.get_words(job_id)],
+    )
+
+
+@router.get('/changes')
+def get_changes(
+    user: Annotated[User, Depends(get_current_user)],
+    cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=1000),
+) -> ChangesResponse:
+    """
+    Изменения колоды после курсора since: актуальные Schedule и Card для изменённых карточек
+    и id удалённых. Клиент сохраняет cursor и запрашивает следующую порцию, пока has_more.
+    """
+    changes, has_more = schedule_repo.get_changes(user.username, since, limit)
+    deleted = [change.card_id for change in changes if change.deleted]
+    updated = [change.card_id for change in changes if not change.deleted]
+    schedules = schedule_repo.get_schedules_by_card_ids(user.username, updated) if updated else []
+    cards = cards_repo.get_cards(updated) if updated else []
+    return ChangesResponse(
+        cursor=changes[-1].id if changes else since,
+        has_more=has_more,
+        schedules=schedules,
+        cards=cards,
+        deleted=deleted,
+    )
+
+
+@router.get('/search')
+def search_cards(
+    user: Annotated[User, Depends(get_current_user)],
+    cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+) -> SearchResponse:
+    """Поиск по своим карточкам; для следующей страницы передайте next_cursor как cursor."""
+    after = _decode_search_cursor(cursor) if cursor else None
+    results = cards_repo.search_cards(user.username, q, limit, after)
+    next_cursor = None
+    if len(results) == limit:
+        last_card, last_rank = results[-1]
+        next_cursor = _encode_cursor((last_rank, last_card.id))
+    return SearchResponse(cards=[card for card, _ in results], next_cursor=next_cursor)
+
+
+@router.get('/reverso-status')
+def get_reverso_status(user: Annotated[User, Depends(get_current_user)]) -> dict:
+    """Состояние размыкателя и счётчики обращений к Reverso."""
+    return reverso_status()
+
+
+# Объявлен последним: иначе перехватывал бы GET /changes, /search и /reverso-status
+@router.get('/{card_id}', response_model=Card)
+def get_card(
+    card_id: str,
+    user: Annotated[User, Depends(get_current_user)],
+    cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Карточка из расписания пользователя. ETag — хэш тела ответа, поэтому после истечения max-age клиент
+    перепроверяет карточку условным запросом. Только private: ответ требует авторизации.
+    """
+    # 304 тоже только для своих карточек: иначе по ETag можно проверять чужие и удалённые
+    if not schedule_repo.has_card(card_id, user.username):
+        raise HTTPException(status_code=404, detail='Card not found')
+    content = cards_repo.get_card(card_id).model_dump_json()
+    etag = f'"{hashlib.sha256(content.encode()).hexdigest()[:32]}"'
+    headers = {'ETag': etag, 'Cache-Control': f'private, max-age={CARD_MAX_AGE}'}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type='application/json', headers=headers)
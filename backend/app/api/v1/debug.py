@@ -0,0 +1,40 @@
+from typing import Annotated, Literal
+
+import anyio.to_thread
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.api.deps import get_admin_user
+from app.core import profiler, sampler
+from app.core.config import settings
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get('/sql')
+def get_sql_summary(
+    user: Annotated[User, Depends(get_admin_user)],
+    limit: int = Query(default=50, ge=1, le=500),
+) -> dict:
+    """Сводка профилировщика SQL: самые затратные формы запросов и запросы с N+1."""
+    if not settings.SQL_PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail='SQL profiler is disabled')
+    return profiler.summary(limit)
+
+
+@router.get('/profile')
+async def get_profile(
+    user: Annotated[User, Depends(get_admin_user)],
+    seconds: int = Query(default=5, ge=1, le=60),
+    format: Literal['collapsed', 'speedscope'] = 'collapsed',
+):
+    """Семплирует стеки всех потоков процесса в течение seconds и возвращает профиль для flame graph."""
+    interval = settings.PROFILER_SAMPLE_INTERVAL_MS / 1000
+    try:
+        stacks = await anyio.to_thread.run_sync(sampler.sample, seconds, interval)
+    except sampler.ProfilerBusyError:
+        raise HTTPException(status_code=409, detail='Profiling is already in progress')
+    if format == 'speedscope':
+        return JSONResponse(sampler.to_speedscope(stacks, interval))
+    return PlainTextResponse(sampler.to_collapsed(stacks))
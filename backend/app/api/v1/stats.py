@@ -1,10 +1,17 @@
+from datetime import datetime
 from typing import Annotated
 
-from app.api.deps import get_cards_repo, get_current_user, get_history_repo, get_schedule_repo
+from app.api.deps import (
+    get_analytics_history_repo,
+    get_analytics_schedule_repo,
+    get_current_user,
+    get_history_repo,
+    get_schedule_repo,
+)
 from app.models.user import User
-from app.repositories.cards import CardsRepo
 from app.repositories.history import HistoryRepo
 from app.repositories.schedule import ScheduleRepo
+from app.services.forecast import forecast
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 
@@ -28,6 +35,12 @@ class DueChartData(BaseModel):
     count: int
 
 
+class ForecastData(BaseModel):
+    date: str
+    reviews: float
+    new: int
+
+
 class ActivityData(BaseModel):
     date: str
     count: int
@@ -41,7 +54,7 @@ class TodayStats(BaseModel):
 @router.get('/overview')
 def get_overview(
     user: Annotated[User, Depends(get_current_user)],
-    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_analytics_schedule_repo)],
 ) -> StatsOverview:
     amount = schedule_repo.get_amount(user.username)
     total = amount.new + amount.cram + amount.due
@@ -56,31 +69,51 @@ def get_overview(
 @router.get('/hardest')
 def get_hardest(
     user: Annotated[User, Depends(get_current_user)],
-    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_analytics_schedule_repo)],
     limit: int = Query(default=10, ge=1, le=20),
 ) -> list[HardestCard]:
     cards = schedule_repo.get_hardest_cards(user.username, limit)
-    return [HardestCard(card=item['card'], ease=item['ease']) for item in cards]
+    return [
+        HardestCard(card={**row.card._asdict(), 'created_at': row.card.created_at.isoformat()}, ease=row.ease)
+        for row in cards
+    ]
 
 
 @router.get('/due-chart')
 def get_due_chart(
     user: Annotated[User, Depends(get_current_user)],
-    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_analytics_schedule_repo)],
     days: int = Query(default=30, ge=1, le=365),
 ) -> list[DueChartData]:
     data = schedule_repo.get_due_chart(user.username, days)
-    return [DueChartData(date=item['date'], count=item['count']) for item in data]
+    return [DueChartData(date=item.date, count=item.count) for item in data]
+
+
+@router.get('/forecast')
+def get_forecast(
+    user: Annotated[User, Depends(get_current_user)],
+    analytics_schedule_repo: Annotated[ScheduleRepo, Depends(get_analytics_schedule_repo)],
+    history_repo: Annotated[HistoryRepo, Depends(get_analytics_history_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    days: int = Query(default=365, ge=1, le=365),
+) -> list[ForecastData]:
+    # В отличие от due-chart учитывает повторные показы отвеченных карточек и ввод новых по лимиту
+    now = datetime.now()
+    rows = analytics_schedule_repo.get_scheduling_state(user.username, now)
+    # Лимиты — из основной базы: get_limits наполняет общий кэш, снимок мог устареть
+    new_today = schedule_repo.get_limits(user).new_limit
+    data = forecast(rows, user, history_repo.get_accuracy(user.username), new_today, now, days)
+    return [ForecastData(**item) for item in data]
 
 
 @router.get('/activity')
 def get_activity(
     user: Annotated[User, Depends(get_current_user)],
-    history_repo: Annotated[HistoryRepo, Depends(get_history_repo)],
+    history_repo: Annotated[HistoryRepo, Depends(get_analytics_history_repo)],
     days: int = Query(default=365, ge=1, le=365),
 ) -> list[ActivityData]:
     data = history_repo.get_activity_data(user.username, days)
-    return [ActivityData(date=item['date'], count=item['count']) for item in data]
+    return [ActivityData(date=item.date, count=item.count) for item in data]
 
 
 @router.get('/today')
@@ -3,36 +3,38 @@ from datetime import datetime, timedelta
 from typing import Annotated
 
 from app.api.deps import get_cards_repo, get_current_user, get_history_repo, get_schedule_repo
+from app.core.database import engine
 from app.models.entities import Answer, Card, CardStatus, History, IncreaseLimitsRequest, ScheduleAmount
 from app.models.user import User
 from app.repositories.cards import CardsRepo
 from app.repositories.history import HistoryRepo
 from app.repositories.schedule import ScheduleRepo
-from fastapi import APIRouter, Depends, HTTPException
+from app.services.scheduler import ScheduleState, next_state
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlmodel import Session
 
 router = APIRouter()
 
 
-@router.get('/stats')
-def get_stats(
-    user: Annotated[User, Depends(get_current_user)], schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)]
-) -> ScheduleAmount:
-    amount = schedule_repo.get_amount(user.username)
-    limits = schedule_repo.get_limits(user)
-    return ScheduleAmount(
-        new=min(amount.new, limits.new_limit), cram=amount.cram, due=min(amount.due, limits.due_limit)
-    )
+class CardRef(BaseModel):
+    id: str
 
 
-@router.get('/next')
-def get_next_card(
-    user: Annotated[User, Depends(get_current_user)],
-    cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
-    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
-) -> Card | None:
+class BulkDeleteRequest(BaseModel):
+    card_ids: list[str]
+    with_history: bool = False
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+
+
+def pick_next_card_id(user: User, schedule_repo: ScheduleRepo) -> str | None:
     cram = schedule_repo.get_cram(user.username)
     if cram and cram.due <= datetime.now():
-        return cards_repo.get_card(cram.card_id)
+        return cram.card_id
 
     amount = schedule_repo.get_amount(user.username)
     limits = schedule_repo.get_limits(user)
@@ -41,25 +43,39 @@ def get_next_card(
 
     if new_limit == 0 and due_limit == 0:
         if cram:
-            return cards_repo.get_card(cram.card_id)
+            return cram.card_id
         return None
 
     get_card_id = random.choices([schedule_repo.get_new, schedule_repo.get_due], weights=[new_limit, due_limit], k=1)[0]
 
     card_schedule = get_card_id(user.username)
     if card_schedule:
-        return cards_repo.get_card(card_schedule.card_id)
+        return card_schedule.card_id
 
     return None
 
 
-@router.post('/answer')
-def answer_card(
-    answer: Answer,
-    user: Annotated[User, Depends(get_current_user)],
-    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
-    history_repo: Annotated[HistoryRepo, Depends(get_history_repo)],
-) -> None:
+def pick_next_card(user: User, cards_repo: CardsRepo, schedule_repo: ScheduleRepo) -> Card | None:
+    if card_id := pick_next_card_id(user, schedule_repo):
+        return cards_repo.get_card(card_id)
+    return None
+
+
+def prefetch_session_cards(user: User) -> None:
+    """Загружает в кэш карточки сегодняшней сессии одним-двумя запросами вместо запроса на каждую."""
+    with Session(engine) as db:
+        schedule_repo = ScheduleRepo(db)
+        card_ids = schedule_repo.get_session_card_ids(user.username, schedule_repo.get_limits(user).due_limit)
+        CardsRepo(db).prefetch(card_ids)
+
+
+def collect_orphan_cards(card_ids: list[str]) -> None:
+    """Удаляет карточки из card_ids, которые больше не входят ни в одно расписание."""
+    with Session(engine) as db:
+        CardsRepo(db).delete_orphan_cards(card_ids)
+
+
+def apply_answer(answer: Answer, user: User, schedule_repo: ScheduleRepo, history_repo: HistoryRepo) -> None:
     if not (schedule := schedule_repo.get_schedule(answer.card_id, user.username)):
         raise HTTPException(status_code=404, detail='Schedule not found')
 
@@ -71,30 +87,103 @@ def answer_card(
 
     history_repo.add_history(History(username=user.username, card_id=answer.card_id, answer=answer.answer))
 
-    if answer.answer:
-        match schedule.interval_min:
-            case 10:
-                schedule.interval_min = 60 * 24
-            case None | 1:
-                schedule.interval_min = 10
-            case _:
-                schedule.interval_min = int(schedule.interval_min * schedule.ease)
-        schedule.ease *= user.bonus
-        match schedule.status:
-            case CardStatus.NEW:
-                schedule.status = CardStatus.CRAM
-            case CardStatus.CRAM:
-                # Для перехода из CRAM в DUE интервал должен быть больше 10 минут
-                # (т.е. не первый правильный ответ после неправильного)
-                if schedule.interval_min > 10:
-                    schedule.status = CardStatus.DUE
-    else:
-        schedule.ease *= user.punishment
-        schedule.status = CardStatus.CRAM
-        schedule.interval_min = 1
-
+    previous_status = schedule.status
+    state = next_state(
+        ScheduleState(interval_min=schedule.interval_min, ease=schedule.ease, status=previous_status),
+        answer.answer,
+        user.bonus,
+        user.punishment,
+    )
+    schedule.interval_min, schedule.ease, schedule.status = state.interval_min, state.ease, state.status
     schedule.due = datetime.now() + timedelta(minutes=schedule.interval_min)
-    schedule_repo.update_schedule(schedule)
+    schedule_repo.update_schedule(schedule, previous_status)
+
+
+@router.get('/stats')
+def get_stats(
+    user: Annotated[User, Depends(get_current_user)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    background_tasks: BackgroundTasks,
+) -> ScheduleAmount:
+    # Клиент запрашивает статистику при открытии сессии: кэш карточек наполняется уже после ответа
+    background_tasks.add_task(prefetch_session_cards, user)
+    amount = schedule_repo.get_amount(user.username)
+    limits = schedule_repo.get_limits(user)
+    return ScheduleAmount(
+        new=min(amount.new, limits.new_limit), cram=amount.cram, due=min(amount.due, limits.due_limit)
+    )
+
+
+@router.get('/next')
+def get_next_card(
+    user: Annotated[User, Depends(get_current_user)],
+    cards_repo: Annotated[CardsRepo, Depends(get_cards_repo)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    ids_only: bool = Query(default=False, description='вернуть только id; тело карточки — GET /cards/{id}'),
+) -> Card | CardRef | None:
+    if ids_only:
+        card_id = pick_next_card_id(user, schedule_repo)
+        return CardRef(id=card_id) if card_id else None
+    return pick_next_card(user, cards_repo, schedule_repo)
+
+
+@router.post('/answer')
+def answer_card(
+    answer: Answer,
+    user: Annotated[User, Depends(get_current_user)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    history_repo: Annotated[HistoryRepo, Depends(get_history_repo)],
+) -> None:
+    apply_answer(answer, user, schedule_repo, history_repo)
+
+
+@router.websocket('/session')
+async def study_session(websocket: WebSocket, token: str = Query(...)) -> None:
+    """
+    Постоянный канал учебной сессии.
+
+    Пользователь аутентифицируется один раз при подключении (токен в query, т.к. браузер не передаёт
+    заголовки для WebSocket). Сервер сразу присылает {"card": ...}; клиент отвечает
+    {"card_id": ..., "answer": ...} и в ответ получает следующую карточку. На каждое сообщение открывается
+    своя короткая сессия БД: пока клиент думает над карточкой, соединение из пула и транзакция не удерживаются.
+    Сообщение, которое не разбирается как ответ (в том числе не JSON), получает {"error": ...}.
+    """
+    try:
+        user = await run_in_threadpool(get_current_user, token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    def pick_first() -> Card | None:
+        with Session(engine) as db:
+            return pick_next_card(user, CardsRepo(db), ScheduleRepo(db))
+
+    def answer_and_pick_next(answer: Answer) -> Card | None:
+        with Session(engine) as db:
+            schedule_repo = ScheduleRepo(db)
+            apply_answer(answer, user, schedule_repo, HistoryRepo(db))
+            return pick_next_card(user, CardsRepo(db), schedule_repo)
+
+    await websocket.accept()
+    await run_in_threadpool(prefetch_session_cards, user)
+    try:
+        card = await run_in_threadpool(pick_first)
+        await websocket.send_json({'card': card.model_dump(mode='json') if card else None})
+        while True:
+            message = await websocket.receive_text()
+            try:
+                # Некорректный JSON тоже даёт ValidationError, а не обрыв соединения
+                answer = Answer.model_validate_json(message)
+                card = await run_in_threadpool(answer_and_pick_next, answer)
+            except ValidationError as e:
+                await websocket.send_json({'error': e.errors(include_url=False, include_context=False)})
+                continue
+            except HTTPException as e:
+                await websocket.send_json({'error': e.detail})
+                continue
+            await websocket.send_json({'card': card.model_dump(mode='json') if card else None})
+    except WebSocketDisconnect:
+        pass
 
 
 @router.delete('/cards/{card_id}')
@@ -112,6 +201,21 @@ def delete_card(
         cards_repo.delete_card(card_id)
 
 
+@router.post('/cards/bulk-delete')
+def bulk_delete_cards(
+    request: BulkDeleteRequest,
+    user: Annotated[User, Depends(get_current_user)],
+    schedule_repo: Annotated[ScheduleRepo, Depends(get_schedule_repo)],
+    background_tasks: BackgroundTasks,
+) -> BulkDeleteResponse:
+    """Удаляет карточки из расписания (и историю ответов, если with_history) одной транзакцией."""
+    deleted = schedule_repo.delete_schedules(user.username, request.card_ids, request.with_history)
+    # Карточки без расписаний убираются уже после ответа
+    if deleted:
+        background_tasks.add_task(collect_orphan_cards, deleted)
+    return BulkDeleteResponse(deleted=len(deleted))
+
+
 @router.post('/limits/increase')
 def increase_limits(
     request: IncreaseLimitsRequest,
@@ -8,14 +8,66 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 
 class Settings(BaseSettings):
     DB_URL: str = 'sqlite:///flips.db'
+    # Настройки пула соединений (используются для серверных БД, например PostgreSQL)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
 
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_HOURS: int
 
+    # Путь к users.json; по умолчанию backend/users.json
+    USERS_FILE: str = ''
+    # Проверка паролей bcrypt в отдельных процессах: число процессов и сколько входов может ждать в очереди
+    PASSWORD_WORKERS: int = 2
+    PASSWORD_QUEUE_LIMIT: int = 16
+
     SOURCE_LANGUAGE: str = 'en'
     TARGET_LANGUAGE: str = 'ru'
 
+    # Обращения к Reverso: таймаут, повторы, ограничение частоты и размыкатель
+    REVERSO_URL: str = 'https://definition-api.reverso.net/v1/api/definitions'
+    REVERSO_TIMEOUT: float = 5.0
+    REVERSO_RETRIES: int = 2
+    REVERSO_RATE_LIMIT: float = 5.0
+    REVERSO_BURST: int = 10
+    REVERSO_BREAKER_THRESHOLD: int = 5
+    REVERSO_BREAKER_RESET: float = 30.0
+    # Локальный снимок словаря (build_snapshot.py); слова из него не запрашиваются у Reverso
+    REVERSO_SNAPSHOT_PATH: str = ''
+
+    # Отдельный движок только на чтение для /stats: другая база (реплика) или периодический снимок основной
+    ANALYTICS_DB_URL: str = ''
+    ANALYTICS_SNAPSHOT_PATH: str = ''
+    ANALYTICS_SNAPSHOT_INTERVAL: float = 300.0
+    ANALYTICS_CACHE_SIZE_KB: int = 65536
+    ANALYTICS_MMAP_SIZE: int = 268435456
+
+    # Число карточек в LRU-кэше процесса
+    CARD_CACHE_SIZE: int = 10_000
+
+    # Прогрев после старта (/health/ready отвечает 200 после него): сколько МБ файла базы прочитать в кэш ОС
+    WARMUP_ENABLED: bool = True
+    WARMUP_PRELOAD_MB: int = 256
+
+    # Фоновый импорт списков слов
+    IMPORT_WORKERS: int = 2
+    IMPORT_BATCH_SIZE: int = 20
+
+    # Эндпоинт /metrics в формате Prometheus и сбор метрик по запросам
+    METRICS_ENABLED: bool = False
+
+    # Профилирование SQL: медленные запросы с планом, поиск N+1, сводка на /api/v1/debug/sql
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_HEADERS: bool = False  # заголовки X-SQL-Queries / X-SQL-Time-Ms (для разработки)
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_REPEAT_THRESHOLD: int = 10
+    # Период семплирования для /api/v1/debug/profile
+    PROFILER_SAMPLE_INTERVAL_MS: float = 10.0
+
     SSL_ENABLED: bool = False
     SSL_CERT_PATH: str = ''
     SSL_KEY_PATH: str = ''
@@ -1,18 +1,205 @@
-from typing import Generator
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Generator
 
+from sqlalchemy import Engine, event, text
+from sqlalchemy.engine import make_url
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import settings
-from app.models.entities import Card, History, Limits, Schedule  # noqa: F401
+from app.models.entities import Card, History, ImportJob, ImportJobWord, Limits, Schedule, ScheduleChange  # noqa: F401
+from app.repositories.schedule import ScheduleRepo
 
-engine = create_engine(settings.DB_URL)
+
+def _engine_options(db_url: str) -> dict[str, Any]:
+    """Параметры движка в зависимости от диалекта: SQLite работает с файлом, серверным БД нужен пул."""
+    if make_url(db_url).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': settings.DB_POOL_SIZE,
+        'max_overflow': settings.DB_MAX_OVERFLOW,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+    }
+
+
+logger = logging.getLogger(__name__)
+
+engine = create_engine(settings.DB_URL, **_engine_options(settings.DB_URL))
+
+if engine.dialect.name == 'sqlite':
+
+    @event.listens_for(engine, 'connect')
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL: читатели (в том числе аналитика) не блокируют запись ответов и наоборот
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode = WAL')
+        cursor.execute('PRAGMA busy_timeout = 5000')
+        cursor.close()
+
+
+def _sqlite_path(db_url: str) -> str | None:
+    url = make_url(db_url)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return url.database
+
+
+def _create_analytics_engine() -> Engine:
+    """
+    Отдельный движок для тяжёлых агрегатов /stats: свой пул, а для SQLite — соединения только на чтение
+    (mode=ro, query_only) с собственным кэшем страниц и mmap. Читает либо основную базу, либо её снимок.
+    """
+    db_url = settings.ANALYTICS_DB_URL or settings.DB_URL
+    if make_url(db_url).get_backend_name() != 'sqlite':
+        return create_engine(db_url, **_engine_options(db_url))
+    if not (path := settings.ANALYTICS_SNAPSHOT_PATH or _sqlite_path(db_url)):
+        return engine
+
+    analytics = create_engine(f'sqlite:///file:{Path(path).absolute()}?mode=ro&uri=true')
+
+    @event.listens_for(analytics, 'connect')
+    def _configure_read_only(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA query_only = 1')
+        cursor.execute(f'PRAGMA cache_size = -{settings.ANALYTICS_CACHE_SIZE_KB}')
+        cursor.execute(f'PRAGMA mmap_size = {settings.ANALYTICS_MMAP_SIZE}')
+        cursor.close()
+
+    return analytics
+
+
+analytics_engine = _create_analytics_engine()
+
+# Полнотекстовый индекс по карточкам (только SQLite/FTS5). Ключ строки индекса — id из card_search, а не rowid
+# таблицы card: неявный rowid VACUUM может перенумеровать, а явный INTEGER PRIMARY KEY сохраняется.
+# card_search сопоставляет этот ключ с card.id (уникальный индекс), поэтому триггеры находят строку индекса
+# по id карточки без перебора.
+_CARD_FTS_COLUMNS = 'word, translation, definition, example'
+_CARD_FTS_DDL = [
+    'DROP TABLE IF EXISTS card_search',
+    'CREATE TABLE card_search (id INTEGER PRIMARY KEY, card_id TEXT NOT NULL UNIQUE)',
+    f"""CREATE VIRTUAL TABLE card_fts USING fts5(
+        {_CARD_FTS_COLUMNS}, tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    'INSERT INTO card_search(card_id) SELECT id FROM card',
+    f"""INSERT INTO card_fts(rowid, {_CARD_FTS_COLUMNS})
+        SELECT card_search.id, {_CARD_FTS_COLUMNS} FROM card JOIN card_search ON card_search.card_id = card.id""",
+]
+_CARD_FTS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS card_fts_ai AFTER INSERT ON card BEGIN
+        INSERT INTO card_search(card_id) VALUES (new.id);
+        INSERT INTO card_fts(rowid, {_CARD_FTS_COLUMNS})
+        VALUES ((SELECT id FROM card_search WHERE card_id = new.id), new.word, new.translation, new.definition,
+                new.example);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS card_fts_ad AFTER DELETE ON card BEGIN
+        DELETE FROM card_fts WHERE rowid = (SELECT id FROM card_search WHERE card_id = old.id);
+        DELETE FROM card_search WHERE card_id = old.id;
+    END""",
+]
+# Индекс прежнего формата (external content по rowid таблицы card) и его триггеры
+_LEGACY_CARD_FTS_DDL = [
+    'DROP TRIGGER IF EXISTS card_fts_ai',
+    'DROP TRIGGER IF EXISTS card_fts_ad',
+    'DROP TRIGGER IF EXISTS card_fts_au',
+    'DROP TABLE card_fts',
+]
+
+
+def init_card_search(bind: Engine = engine) -> None:
+    """Создаёт FTS5-индекс по карточкам и триггеры синхронизации; новый индекс заполняет из card."""
+    if bind.dialect.name != 'sqlite':
+        return
+    with bind.begin() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'card_fts'")).scalar()
+        if sql is not None and 'content=' in sql:
+            logger.info('Перестраиваем полнотекстовый индекс карточек: ключ card_search вместо rowid таблицы card')
+            for statement in _LEGACY_CARD_FTS_DDL:
+                conn.execute(text(statement))
+            sql = None
+        if sql is None:
+            for statement in _CARD_FTS_DDL:
+                conn.execute(text(statement))
+        for statement in _CARD_FTS_TRIGGERS:
+            conn.execute(text(statement))
+
+
+# Индексы, которые заменены более широкими: create_all не трогает существующие, поэтому удаляем их в init_db
+_LEGACY_INDEXES = ['ix_schedule_username_status_due']
 
 
 def init_db() -> None:
-    """Инициализирует базу данных, создавая все таблицы."""
+    """Инициализирует базу данных, создавая все таблицы и недостающие индексы."""
     SQLModel.metadata.create_all(engine)
+    # create_all пропускает индексы уже существующих таблиц, поэтому досоздаём их отдельно
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        for name in _LEGACY_INDEXES:
+            conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+    init_card_search()
+    with Session(engine) as session:
+        schedule_repo = ScheduleRepo(session)
+        schedule_repo.backfill_changes()
+        schedule_repo.backfill_counts()
+
+
+def refresh_analytics_snapshot() -> None:
+    """Копирует основную базу в ANALYTICS_SNAPSHOT_PATH (backup API, не блокирует запись в WAL) и подменяет файл."""
+    target = Path(settings.ANALYTICS_SNAPSHOT_PATH)
+    tmp = target.with_name(target.name + '.tmp')
+    tmp.unlink(missing_ok=True)
+    source = sqlite3.connect(_sqlite_path(settings.DB_URL))
+    try:
+        destination = sqlite3.connect(tmp)
+        try:
+            source.backup(destination)
+            # Снимок только читается: обычный журнал, чтобы не нужны были -wal/-shm рядом с ним
+            destination.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            destination.close()
+    finally:
+        source.close()
+    os.replace(tmp, target)
+    # Соединения со старым файлом закрываются по мере возврата в пул
+    analytics_engine.dispose()
+
+
+_snapshot_stop = threading.Event()
+
+
+def _refresh_snapshots_forever() -> None:
+    while not _snapshot_stop.wait(settings.ANALYTICS_SNAPSHOT_INTERVAL):
+        try:
+            refresh_analytics_snapshot()
+        except Exception as e:
+            logger.error(f'Не удалось обновить снимок для аналитики: {e}', exc_info=True)
+
+
+def start_analytics_snapshots() -> None:
+    """Создаёт снимок для аналитики (если он включён) и запускает его периодическое обновление."""
+    if not settings.ANALYTICS_SNAPSHOT_PATH or not _sqlite_path(settings.DB_URL):
+        return
+    refresh_analytics_snapshot()
+    _snapshot_stop.clear()
+    threading.Thread(target=_refresh_snapshots_forever, name='analytics-snapshot', daemon=True).start()
+
+
+def stop_analytics_snapshots() -> None:
+    _snapshot_stop.set()
 
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+def get_analytics_session() -> Generator[Session, None, None]:
+    with Session(analytics_engine) as session:
+        yield session
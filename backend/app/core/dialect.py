@@ -0,0 +1,57 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Date, Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class day_of(FunctionElement):
+    """Дата (без времени) из столбца datetime, одинаково для SQLite и PostgreSQL."""
+
+    type = Date()
+    name = 'day_of'
+    inherit_cache = True
+
+
+@compiles(day_of)
+def _compile_day_of(element, compiler, **kw):
+    return f'CAST({compiler.process(element.clauses, **kw)} AS DATE)'
+
+
+@compiles(day_of, 'sqlite')
+def _compile_day_of_sqlite(element, compiler, **kw):
+    # В SQLite CAST(... AS DATE) даёт число, поэтому используем date()
+    return f'date({compiler.process(element.clauses, **kw)})'
+
+
+class minutes_between(FunctionElement):
+    """Минуты от start до end (end - start) дробным числом, одинаково для SQLite и PostgreSQL; NULL, если end NULL."""
+
+    type = Float()
+    name = 'minutes_between'
+    inherit_cache = True
+
+
+@compiles(minutes_between)
+def _compile_minutes_between(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f'CAST(EXTRACT(EPOCH FROM ({end} - {start})) / 60 AS DOUBLE PRECISION)'
+
+
+@compiles(minutes_between, 'sqlite')
+def _compile_minutes_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f'((julianday({end}) - julianday({start})) * 1440.0)'
+
+
+def day_start(day: date) -> datetime:
+    """Начало суток: границы диапазонов вместо func.date() по столбцу, чтобы работали индексы."""
+    return datetime.combine(day, time.min)
+
+
+def today_start() -> datetime:
+    return day_start(date.today())
+
+
+def tomorrow_start() -> datetime:
+    return day_start(date.today() + timedelta(days=1))
@@ -0,0 +1,200 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        # labels -> [счётчики по корзинам (+Inf последней), сумма, количество]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if (entry := self._values.get(labels)) is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                    cumulative += bucket_count
+                    le = f'le="{bound}"'
+                    lines.append(f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labels, labels)} {total}')
+                lines.append(f'{self.name}_count{_format_labels(self.labels, labels)} {count}')
+        return lines
+
+
+http_requests = Counter('flips_http_requests_total', 'HTTP requests', ('method', 'route', 'status'))
+http_latency = Histogram('flips_http_request_seconds', 'HTTP request latency', ('method', 'route'))
+http_in_flight = Gauge('flips_http_requests_in_flight', 'HTTP requests being processed')
+db_statements = Histogram(
+    'flips_http_request_db_statements', 'SQL statements per HTTP request', ('route',), COUNT_BUCKETS
+)
+db_time = Histogram('flips_http_request_db_seconds', 'Time spent in SQL per HTTP request', ('route',))
+reverso_latency = Histogram('flips_reverso_request_seconds', 'Reverso HTTP call latency', ('outcome',))
+cache_requests = Counter('flips_cache_requests_total', 'Cache lookups', ('cache', 'result'))
+password_hash_time = Histogram('flips_password_hash_seconds', 'bcrypt verification time in the worker process')
+password_queue_time = Histogram('flips_password_queue_seconds', 'Wait for a free password worker')
+password_in_flight = Gauge('flips_password_checks_in_flight', 'Password checks running or queued')
+password_rejected = Counter('flips_password_rejected_total', 'Logins rejected because the password pool is saturated')
+threadpool_in_use = Gauge('flips_threadpool_in_use', 'Busy worker threads of the sync endpoint threadpool')
+threadpool_size = Gauge('flips_threadpool_size', 'Size of the sync endpoint threadpool')
+
+REGISTRY = [
+    http_requests,
+    http_latency,
+    http_in_flight,
+    db_statements,
+    db_time,
+    reverso_latency,
+    cache_requests,
+    password_hash_time,
+    password_queue_time,
+    password_in_flight,
+    password_rejected,
+    threadpool_in_use,
+    threadpool_size,
+]
+
+
+def render() -> str:
+    """Все метрики в текстовом формате Prometheus. Вызывается из event loop (нужен лимитер anyio)."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    threadpool_in_use.set(value=limiter.borrowed_tokens)
+    threadpool_size.set(value=limiter.total_tokens)
+    return '\n'.join(line for metric in REGISTRY for line in metric.render()) + '\n'
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_time: float = 0.0
+
+
+# Статистика текущего запроса; sync-эндпоинты в threadpool видят тот же объект через копию контекста
+_request_stats: ContextVar[RequestStats | None] = ContextVar('request_stats', default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Считает SQL-запросы и время в БД для текущего HTTP-запроса."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_start'].pop()
+        if stats := _request_stats.get():
+            stats.statements += 1
+            stats.db_time += elapsed
+
+
+def _route_template(scope: dict) -> str:
+    """Шаблон маршрута (/api/v1/cards/jobs/{job_id}) вместо фактического пути, чтобы не плодить серии."""
+    route = scope.get('route')
+    if route is None or not hasattr(route, 'path_regex'):
+        return '<unmatched>'
+    # Маршрутизатор кладёт в scope совпавший маршрут. Новые версии FastAPI не копируют маршруты при
+    # include_router, и route.path тогда без префикса роутера: префикс — часть пути до совпавшего хвоста.
+    path = scope['path']
+    for index, char in enumerate(path):
+        if char == '/' and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: латентность, число запросов в обработке и нагрузка на БД по маршрутам."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        finished = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, finished
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+            # Ответ отправлен целиком: фоновые задачи после него в латентность не входят
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                finished = time.perf_counter()
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = (finished or time.perf_counter()) - start
+            http_in_flight.dec()
+            _request_stats.reset(token)
+            route = _route_template(scope)
+            http_requests.inc(scope['method'], route, str(status_code))
+            http_latency.observe(scope['method'], route, value=elapsed)
+            db_statements.observe(route, value=stats.statements)
+            db_time.observe(route, value=stats.db_time)
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.core.metrics import password_hash_time, password_in_flight, password_queue_time, password_rejected
+from app.core.security import verify_password
+
+# bcrypt держит CPU сотни миллисекунд на проверку; в отдельных процессах он не отнимает GIL и threadpool
+# у остальных запросов. Счётчик меняется только из event loop, поэтому блокировка не нужна.
+_executor: ProcessPoolExecutor | None = None
+_in_flight = 0
+
+
+class PasswordPoolBusyError(Exception):
+    """Все процессы заняты и очередь ожидания заполнена."""
+
+
+def _timed_check(plain_password: str, hashed_password: str) -> tuple[bool, float]:
+    start = time.perf_counter()
+    result = verify_password(plain_password, hashed_password)
+    return result, time.perf_counter() - start
+
+
+def _warm_up() -> None:
+    """Пустая задача: процесс запускается и импортирует этот модуль вместе с bcrypt."""
+
+
+def start_password_pool() -> None:
+    """Поднимает процессы заранее, чтобы первый вход не ждал их запуска."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(settings.PASSWORD_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        for _ in range(settings.PASSWORD_WORKERS):
+            _executor.submit(_warm_up)
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _release() -> None:
+    global _in_flight
+    _in_flight -= 1
+    password_in_flight.set(value=_in_flight)
+
+
+def _release_from(loop: asyncio.AbstractEventLoop) -> None:
+    """Колбэк future из потока пула: счётчик меняется только в event loop."""
+    try:
+        loop.call_soon_threadsafe(_release)
+    except RuntimeError:
+        # Loop уже закрыт (остановка приложения): освобождать слот больше не для кого
+        pass
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Проверяет пароль в пуле процессов. Одновременно считается не больше PASSWORD_WORKERS паролей,
+    ещё PASSWORD_QUEUE_LIMIT ждут; сверх этого сразу PasswordPoolBusyError.
+    """
+    global _in_flight
+    if _in_flight >= settings.PASSWORD_WORKERS + settings.PASSWORD_QUEUE_LIMIT:
+        password_rejected.inc()
+        raise PasswordPoolBusyError()
+
+    start_password_pool()
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    try:
+        future = _executor.submit(_timed_check, plain_password, hashed_password)
+        _in_flight += 1
+        password_in_flight.set(value=_in_flight)
+        # Слот освобождается, когда процесс закончил, даже если клиент уже отключился
+        future.add_done_callback(lambda _: _release_from(loop))
+        result, elapsed = await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        # Процесс пула упал (например, OOM killer): следующий вызов создаст пул заново
+        shutdown_password_pool()
+        raise
+    password_hash_time.observe(value=elapsed)
+    password_queue_time.observe(value=max(0.0, time.perf_counter() - submitted - elapsed))
+    return result
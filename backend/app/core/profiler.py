@@ -0,0 +1,140 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Ограничение на число различных форм запросов в сводке, чтобы не расти без предела
+_MAX_SHAPES = 500
+
+
+@dataclass
+class QueryProfile:
+    statements: int = 0
+    total_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class ShapeStats:
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+_profile: ContextVar[QueryProfile | None] = ContextVar('query_profile', default=None)
+_summary: dict[str, ShapeStats] = {}
+_repeated: deque = deque(maxlen=50)
+_lock = threading.Lock()
+
+
+def _shape(statement: str) -> str:
+    # Параметры уже вынесены в плейсхолдеры, остаётся нормализовать пробелы
+    return re.sub(r'\s+', ' ', statement).strip()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    conn.info['profiler_explaining'] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        return '\n'.join(' | '.join(str(value) for value in row) for row in rows)
+    except Exception as e:
+        return f'не удалось получить план: {e}'
+    finally:
+        conn.info['profiler_explaining'] = False
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Профилирование SQL: счётчики на запрос, журнал медленных запросов с планом и сводка по формам."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['profiler_start'].pop()
+        if conn.info.get('profiler_explaining'):
+            return
+        shape = _shape(statement)
+
+        if profile := _profile.get():
+            profile.statements += 1
+            profile.total_time += elapsed
+            profile.shapes[shape] += 1
+
+        with _lock:
+            if (stats := _summary.get(shape)) is None and len(_summary) < _MAX_SHAPES:
+                stats = _summary[shape] = ShapeStats()
+            if stats:
+                stats.count += 1
+                stats.total_time += elapsed
+                stats.max_time = max(stats.max_time, elapsed)
+
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS and not executemany and shape.upper().startswith('SELECT'):
+            logger.warning(
+                f'Медленный SQL-запрос ({elapsed * 1000:.1f} мс): {shape}\nПлан:\n{_explain(conn, statement, parameters)}'
+            )
+
+
+def summary(limit: int = 50) -> dict:
+    """Самые затратные формы запросов и последние запросы с повторяющимися (N+1) выражениями."""
+    with _lock:
+        top = sorted(_summary.items(), key=lambda item: item[1].total_time, reverse=True)[:limit]
+        return {
+            'statements': [
+                {
+                    'statement': shape,
+                    'count': stats.count,
+                    'total_ms': round(stats.total_time * 1000, 3),
+                    'avg_ms': round(stats.total_time * 1000 / stats.count, 3),
+                    'max_ms': round(stats.max_time * 1000, 3),
+                }
+                for shape, stats in top
+            ],
+            'repeated': list(_repeated),
+        }
+
+
+class SQLProfilerMiddleware:
+    """ASGI-middleware: собирает профиль SQL на запрос, отмечает N+1 и (в dev-режиме) пишет заголовки."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        profile = QueryProfile()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start' and settings.SQL_PROFILER_HEADERS:
+                headers = list(message.get('headers', []))
+                headers.append((b'x-sql-queries', str(profile.statements).encode()))
+                headers.append((b'x-sql-time-ms', f'{profile.total_time * 1000:.3f}'.encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        token = _profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            repeated = {
+                shape: count for shape, count in profile.shapes.items() if count > settings.SQL_REPEAT_THRESHOLD
+            }
+            if repeated:
+                logger.warning(f'Повторяющиеся SQL-запросы (N+1) в {scope["method"]} {scope["path"]}: {repeated}')
+                with _lock:
+                    _repeated.append({'method': scope['method'], 'path': scope['path'], 'statements': repeated})
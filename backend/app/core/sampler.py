@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Пути в именах кадров показываем относительно корня проекта или site-packages
+_PATH_PREFIXES = sorted({os.path.dirname(path) for path in sys.path if path}, key=len, reverse=True)
+
+_running = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Профилирование уже идёт: одновременно допускается только один сеанс."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix + os.sep):
+            filename = filename[len(prefix) + 1 :]
+            break
+    return f'{code.co_qualname} ({filename}:{code.co_firstlineno})'
+
+
+def sample(seconds: float, interval: float) -> Counter[tuple[str, ...]]:
+    """
+    Снимает стеки всех потоков процесса каждые interval секунд в течение seconds.
+    Возвращает счётчик стеков: (имя потока, кадр от корня, ..., текущий кадр) -> число попаданий.
+    Вне сеанса ничего не работает, поэтому накладных расходов в простое нет.
+    """
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusyError()
+    try:
+        own_thread = threading.get_ident()
+        stacks: Counter[tuple[str, ...]] = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                stacks[(names.get(thread_id, str(thread_id)), *reversed(labels))] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _running.release()
+
+
+def to_collapsed(stacks: Counter[tuple[str, ...]]) -> str:
+    """Формат collapsed stacks (flamegraph.pl, speedscope, inferno): 'кадр;кадр;кадр число'."""
+    return ''.join(f'{";".join(stack)} {count}\n' for stack, count in stacks.most_common())
+
+
+def to_speedscope(stacks: Counter[tuple[str, ...]], interval: float) -> dict:
+    """Формат speedscope (https://www.speedscope.app): по одному sampled-профилю на поток."""
+    frames: list[dict] = []
+    frame_index: dict[str, int] = {}
+    profiles: dict[str, dict] = {}
+    for (thread, *labels), count in stacks.items():
+        indices = []
+        for label in labels:
+            if (index := frame_index.get(label)) is None:
+                index = frame_index[label] = len(frames)
+                frames.append({'name': label})
+            indices.append(index)
+        profile = profiles.setdefault(
+            thread,
+            {'type': 'sampled', 'name': thread, 'unit': 'seconds', 'startValue': 0, 'samples': [], 'weights': []},
+        )
+        profile['samples'].append(indices)
+        profile['weights'].append(count * interval)
+    for profile in profiles.values():
+        profile['endValue'] = sum(profile['weights'])
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': list(profiles.values()),
+        'exporter': 'flips',
+    }
@@ -1,7 +1,8 @@
 from datetime import date, datetime
 from enum import Enum
+from uuid import uuid4
 
-from sqlmodel import Field, SQLModel, UniqueConstraint
+from sqlmodel import Field, Index, SQLModel, UniqueConstraint
 
 
 class CardStatus(Enum):
@@ -10,6 +11,18 @@ class CardStatus(Enum):
     DUE = 'D'
 
 
+class ImportJobStatus(Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+
+
+class ImportWordStatus(Enum):
+    PENDING = 'pending'
+    ADDED = 'added'
+    FAILED = 'failed'
+
+
 class Card(SQLModel, table=True):
     id: str = Field(..., primary_key=True)
     word: str
@@ -23,7 +36,22 @@ class Card(SQLModel, table=True):
 
 
 class Schedule(SQLModel, table=True):
-    __table_args__ = (UniqueConstraint('username', 'card_id', name='unique_username_card_id'),)
+    # Индексы под сортировки списка колоды (keyset-пагинация). id — это rowid, а SQLite неявно дописывает rowid
+    # в конец каждого индекса, так что (username, X) уже упорядочен по (X, id).
+    __table_args__ = (
+        UniqueConstraint('username', 'card_id', name='unique_username_card_id'),
+        Index('ix_schedule_username_created_at', 'username', 'created_at'),
+        Index('ix_schedule_username_ease', 'username', 'ease'),
+        Index('ix_schedule_username_due', 'username', 'due'),
+        # Покрывающий для числа карточек к повторению сегодня и для выбора следующей DUE/CRAM-карточки.
+        # interval_min и ease в хвосте делают покрывающим и чтение состояния колоды для прогноза: без них
+        # каждая строка читалась бы из таблицы по rowid. Меняются вместе с due, так что запись почти не дорожает
+        Index(
+            'ix_schedule_username_status_due_interval_min_ease', 'username', 'status', 'due', 'interval_min', 'ease'
+        ),
+        # Поиск расписаний карточки у всех пользователей: сборка осиротевших карточек
+        Index('ix_schedule_card_id', 'card_id'),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     username: str
@@ -35,7 +63,19 @@ class Schedule(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class ScheduleCounts(SQLModel, table=True):
+    """Число карточек пользователя в каждом статусе. Обновляется ScheduleRepo в тех же транзакциях, что и Schedule."""
+
+    username: str = Field(primary_key=True)
+    new: int = Field(default=0)
+    cram: int = Field(default=0)
+    due: int = Field(default=0)
+
+
 class History(SQLModel, table=True):
+    # Покрывающий индекс: ответы по карточкам в порядке времени читаются без обращения к таблице (пересчёт истории)
+    __table_args__ = (Index('ix_history_username_card_id_created_at', 'username', 'card_id', 'created_at', 'answer'),)
+
     id: int | None = Field(default=None, primary_key=True)
     username: str
     card_id: str
@@ -43,7 +83,26 @@ class History(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class ScheduleChange(SQLModel, table=True):
+    """Журнал изменений Schedule для дельта-синхронизации: по одной записи на карточку пользователя."""
+
+    __table_args__ = (
+        Index('ix_schedulechange_username_id', 'username', 'id'),
+        Index('ix_schedulechange_username_card_id', 'username', 'card_id'),
+        # id служит курсором, поэтому SQLite не должен переиспользовать номера удалённых строк
+        {'sqlite_autoincrement': True},
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    username: str
+    card_id: str
+    deleted: bool = Field(default=False)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
 class Limits(SQLModel, table=True):
+    __table_args__ = (Index('ix_limits_username_created_at', 'username', 'created_at'),)
+
     id: int | None = Field(default=None, primary_key=True)
     username: str
     new_limit: int
@@ -51,6 +110,26 @@ class Limits(SQLModel, table=True):
     created_at: date = Field(default_factory=date.today)
 
 
+class ImportJob(SQLModel, table=True):
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True)
+    username: str
+    status: ImportJobStatus = Field(default=ImportJobStatus.PENDING)
+    total: int = Field(default=0)
+    processed: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class ImportJobWord(SQLModel, table=True):
+    __table_args__ = (Index('ix_importjobword_job_id_position', 'job_id', 'position'),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: str
+    position: int
+    word: str
+    status: ImportWordStatus = Field(default=ImportWordStatus.PENDING)
+
+
 class ScheduleAmount(SQLModel):
     new: int = 0
     cram: int = 0
@@ -0,0 +1,57 @@
+"""
+Модели чтения для горячих путей только на чтение: именованные кортежи, которые заполняются прямо из строк
+Core-запроса с нужными столбцами, без ORM-объектов, identity map и валидации Pydantic на каждую строку.
+"""
+
+from datetime import datetime
+from typing import NamedTuple
+
+from app.models.entities import CardStatus
+
+
+class ScheduleRow(NamedTuple):
+    id: int
+    username: str
+    card_id: str
+    ease: float
+    due: datetime | None
+    interval_min: int | None
+    status: CardStatus
+    created_at: datetime
+
+
+class CardRow(NamedTuple):
+    id: str
+    word: str
+    translation: str
+    definition: str | None
+    meta: str | None
+    pronunciation: str | None
+    example: str | None
+    example_translation: str | None
+    created_at: datetime
+
+
+class HardestCardRow(NamedTuple):
+    card: CardRow
+    ease: float
+
+
+class DeckEntryRow(NamedTuple):
+    schedule_id: int
+    status: CardStatus
+    ease: float
+    due: datetime | None
+    interval_min: int | None
+    added_at: datetime
+    card: CardRow
+
+
+class DayCount(NamedTuple):
+    date: str
+    count: int
+
+
+def columns(row_type: type[NamedTuple], entity: type) -> list:
+    """Столбцы entity в порядке полей row_type: select(*columns(CardRow, Card))."""
+    return [getattr(entity, name) for name in row_type._fields]
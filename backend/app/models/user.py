@@ -7,3 +7,4 @@ class User(SQLModel):
     punishment: float = Field(default=0.8)
     new_limit: int = Field(default=20)
     due_limit: int = Field(default=200)
+    is_admin: bool = Field(default=False)
@@ -1,7 +1,56 @@
+import re
+import threading
+from collections import OrderedDict
+
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlalchemy import Float, String, bindparam, column, exists, literal, or_, text, tuple_
+from sqlmodel import Session, delete, select
+
+from app.core.config import settings
+from app.core.metrics import cache_requests
+from app.models.entities import Card, Schedule
+from app.models.read import CardRow, columns
+
+# Карточки неизменяемы (id — хэш содержимого), поэтому кэш не нужно инвалидировать, только вытеснять.
+# Храним отсоединённые от сессии копии: один объект безопасно отдавать из разных запросов.
+_card_cache: OrderedDict[str, Card] = OrderedDict()
+_card_cache_lock = threading.Lock()
+# Сколько id подставлять в один IN (...) при пакетной загрузке
+_BATCH_SIZE = 500
+# Проверка существования при добавлении карточки, собрана один раз (см. app/repositories/schedule.py)
+_EXISTS_CARD = select(Card.id).where(Card.id == bindparam('card_id'))
+
+
+def _detached(card: Card) -> Card:
+    return Card.model_validate(card.model_dump())
+
+
+def _cache_get(card_id: str) -> Card | None:
+    with _card_cache_lock:
+        if (card := _card_cache.get(card_id)) is not None:
+            _card_cache.move_to_end(card_id)
+    cache_requests.inc('cards', 'hit' if card is not None else 'miss')
+    return card
+
+
+def _cache_put(cards: list[Card]) -> None:
+    with _card_cache_lock:
+        for card in cards:
+            _card_cache[card.id] = card
+            _card_cache.move_to_end(card.id)
+        while len(_card_cache) > settings.CARD_CACHE_SIZE:
+            _card_cache.popitem(last=False)
+
+
+def evict_cards(card_ids: list[str]) -> None:
+    with _card_cache_lock:
+        for card_id in card_ids:
+            _card_cache.pop(card_id, None)
 
-from app.models.entities import Card
+
+def _match_expression(query: str) -> str:
+    """Строит запрос FTS5 из пользовательского ввода: каждое слово ищется как префикс."""
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', query))
 
 
 class CardsRepo:
@@ -9,20 +58,128 @@ class CardsRepo:
         self.db = db
 
     def create_card(self, card: Card) -> None:
-        stmt = select(Card).where(Card.id == card.id)
-        if not (self.db.exec(stmt).first()):
+        if self.db.exec(_EXISTS_CARD, params={'card_id': card.id}).first() is None:
             self.db.add(card)
             self.db.commit()
             return
 
+    def create_cards(self, cards: list[Card]) -> None:
+        """Добавляет пачку карточек одной транзакцией, пропуская уже существующие."""
+        ids = {card.id for card in cards}
+        existing = set(self.db.exec(select(Card.id).where(Card.id.in_(ids))).all()) if ids else set()
+        for card in cards:
+            if card.id not in existing:
+                self.db.add(card)
+                existing.add(card.id)
+        self.db.commit()
+
     def get_card(self, card_id: str) -> Card:
+        if (card := _cache_get(card_id)) is not None:
+            return card
         card = self.db.get(Card, card_id)
         if not card:
             raise HTTPException(status_code=404, detail='Card not found')
+        card = _detached(card)
+        _cache_put([card])
         return card
 
+    def get_cards(self, card_ids: list[str]) -> list[Card]:
+        stmt = select(Card).where(Card.id.in_(card_ids))
+        return list(self.db.exec(stmt).all())
+
+    def get_user_card_rows(self, username: str) -> list[CardRow]:
+        """Карточки из расписания пользователя одним запросом, в порядке расписания."""
+        stmt = (
+            select(*columns(CardRow, Card))
+            .join(Schedule, Schedule.card_id == Card.id)
+            .where(Schedule.username == username)
+            .order_by(Schedule.id)
+        )
+        return [CardRow._make(row) for row in self.db.connection().execute(stmt)]
+
+    def prefetch(self, card_ids: list[str]) -> None:
+        """Загружает в кэш отсутствующие в нём карточки пачками (например, все карточки дня в начале сессии)."""
+        with _card_cache_lock:
+            missing = [card_id for card_id in dict.fromkeys(card_ids) if card_id not in _card_cache]
+        # Больше размера кэша грузить бессмысленно: начало списка сразу вытеснится
+        missing = missing[: settings.CARD_CACHE_SIZE]
+        for start in range(0, len(missing), _BATCH_SIZE):
+            stmt = select(Card).where(Card.id.in_(missing[start : start + _BATCH_SIZE]))
+            _cache_put([_detached(card) for card in self.db.exec(stmt).all()])
+
     def delete_card(self, card_id: str) -> None:
+        evict_cards([card_id])
         card = self.db.get(Card, card_id)
         if card:
             self.db.delete(card)
             self.db.commit()
+
+    def delete_orphan_cards(self, card_ids: list[str] | None = None) -> int:
+        """
+        Удаляет карточки, которых нет ни в одном расписании: среди card_ids или, если они не заданы, во всей таблице.
+        Работает пачками по _BATCH_SIZE, каждая своей транзакцией, чтобы не держать блокировку записи.
+        Возвращает число удалённых карточек.
+        """
+        if card_ids is not None:
+            return sum(
+                self._delete_orphans(card_ids[start : start + _BATCH_SIZE])
+                for start in range(0, len(card_ids), _BATCH_SIZE)
+            )
+        # Обход всей таблицы по возрастанию id: каждая пачка продолжает с места предыдущей
+        deleted, last_id = 0, ''
+        while ids := list(self.db.exec(select(Card.id).where(Card.id > last_id).order_by(Card.id).limit(_BATCH_SIZE))):
+            last_id = ids[-1]
+            deleted += self._delete_orphans(ids)
+        return deleted
+
+    def _delete_orphans(self, card_ids: list[str]) -> int:
+        orphan = ~exists().where(Schedule.card_id == Card.id)
+        if not (orphans := list(self.db.exec(select(Card.id).where(Card.id.in_(card_ids), orphan)))):
+            return 0
+        evict_cards(orphans)
+        # Условие повторяется в DELETE: карточку могли снова добавить в расписание после выборки
+        result = self.db.exec(delete(Card).where(Card.id.in_(orphans), orphan))
+        self.db.commit()
+        return result.rowcount
+
+    def search_cards(
+        self, username: str, query: str, limit: int, after: tuple[float, str] | None = None
+    ) -> list[tuple[Card, float]]:
+        """
+        Ищет по карточкам пользователя (слово, перевод, определение, пример) с учётом префиксов.
+        Результаты упорядочены по релевантности (bm25, меньше - лучше) и id; after - ключ последней
+        строки предыдущей страницы.
+        """
+        if not (match := _match_expression(query)):
+            return []
+        owned = exists().where(Schedule.card_id == Card.id, Schedule.username == username)
+
+        if self.db.get_bind().dialect.name == 'sqlite':
+            # Строка индекса связана с карточкой через card_search (см. app/core/database.py)
+            hits = (
+                text(
+                    'SELECT card_search.card_id, card_fts.rank FROM card_fts '
+                    'JOIN card_search ON card_search.id = card_fts.rowid WHERE card_fts MATCH :match'
+                )
+                .bindparams(match=match)
+                .columns(column('card_id', String), column('rank', Float))
+                .subquery('hits')
+            )
+            rank = hits.c.rank
+            stmt = select(Card, rank).join(hits, hits.c.card_id == Card.id)
+        else:
+            # Без FTS5 ищем подстроку; релевантность одинакова, порядок - по id
+            rank = literal(0.0, Float)
+            patterns = [f'%{token}%' for token in re.findall(r'\w+', query)]
+            stmt = select(Card, rank).where(
+                *[
+                    or_(*(field.ilike(pattern) for field in (Card.word, Card.translation, Card.definition, Card.example)))
+                    for pattern in patterns
+                ]
+            )
+
+        stmt = stmt.where(owned)
+        if after:
+            stmt = stmt.where(tuple_(rank, Card.id) > tuple_(*after))
+        stmt = stmt.order_by(rank, Card.id).limit(limit)
+        return [(card, score) for card, score in self.db.exec(stmt).all()]
@@ -1,8 +1,22 @@
 from datetime import date, datetime, timedelta
 
-from sqlmodel import Session, func, select
+from sqlalchemy import Integer, bindparam
+from sqlmodel import Session, cast, func, select
 
+from app.core.dialect import day_of, day_start, today_start, tomorrow_start
 from app.models.entities import History
+from app.models.read import DayCount
+
+# Собран один раз при импорте (см. запросы в app/repositories/schedule.py); границы суток передаются параметрами
+_SELECT_TODAY_STATS = select(
+    func.count(History.id),
+    func.min(History.created_at),
+    func.max(History.created_at),
+).where(
+    History.username == bindparam('username'),
+    History.created_at >= bindparam('start'),
+    History.created_at < bindparam('end'),
+)
 
 
 class HistoryRepo:
@@ -14,16 +28,8 @@ class HistoryRepo:
         self.db.commit()
 
     def get_today_stats(self, username: str) -> dict:
-        today = date.today()
-        stmt = select(
-            func.count(History.id),
-            func.min(History.created_at),
-            func.max(History.created_at),
-        ).where(
-            History.username == username,
-            func.date(History.created_at) == today,
-        )
-        result = self.db.exec(stmt).first()
+        params = {'username': username, 'start': today_start(), 'end': tomorrow_start()}
+        result = self.db.exec(_SELECT_TODAY_STATS, params=params).first()
         count, first_time, last_time = result if result else (0, None, None)
         return {
             'count': count,
@@ -31,19 +37,47 @@ class HistoryRepo:
             'last_time': last_time,
         }
 
-    def get_activity_data(self, username: str, days: int = 365) -> list[dict]:
+    def get_activity_data(self, username: str, days: int = 365) -> list[DayCount]:
         start_date = date.today() - timedelta(days=days - 1)
         stmt = (
             select(
-                func.date(History.created_at).label('day'),
+                day_of(History.created_at).label('day'),
                 func.count(History.id).label('count'),
             )
             .where(
                 History.username == username,
-                func.date(History.created_at) >= start_date,
+                History.created_at >= day_start(start_date),
             )
-            .group_by(func.date(History.created_at))
-            .order_by(func.date(History.created_at))
+            .group_by(day_of(History.created_at))
+            .order_by(day_of(History.created_at))
+        )
+        return [DayCount(str(row.day), row.count) for row in self.db.exec(stmt)]
+
+    def get_accuracy(self, username: str, days: int = 90) -> float | None:
+        """Доля правильных ответов за последние days дней; None, если ответов не было."""
+        stmt = select(func.avg(cast(History.answer, Integer))).where(
+            History.username == username,
+            History.created_at >= day_start(date.today() - timedelta(days=days - 1)),
+        )
+        return self.db.exec(stmt).first()
+
+    def get_usernames(self) -> list[str]:
+        return list(self.db.exec(select(History.username).distinct()).all())
+
+    def get_answer_sequences(self, username: str) -> list[tuple[str, bool]]:
+        """(card_id, answer) всех ответов пользователя: сгруппированы по карточке, внутри — по времени."""
+        stmt = (
+            select(History.card_id, History.answer)
+            .where(History.username == username)
+            .order_by(History.card_id, History.created_at)
+        )
+        # Миллионы строк: без ORM-обёртки над каждой строкой
+        return list(self.db.connection().execute(stmt).all())
+
+    def get_last_answered(self, username: str) -> dict[str, datetime]:
+        stmt = (
+            select(History.card_id, func.max(History.created_at))
+            .where(History.username == username)
+            .group_by(History.card_id)
         )
-        results = self.db.exec(stmt).all()
-        return [{'date': str(row.day), 'count': row.count} for row in results]
+        return dict(self.db.connection().execute(stmt).all())
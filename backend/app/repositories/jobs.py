@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.models.entities import ImportJob, ImportJobStatus, ImportJobWord, ImportWordStatus
+
+
+class ImportJobsRepo:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, username: str, words: list[str]) -> ImportJob:
+        job = ImportJob(username=username, total=len(words))
+        self.db.add(job)
+        self.db.add_all(ImportJobWord(job_id=job.id, position=i, word=word) for i, word in enumerate(words))
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: str) -> ImportJob | None:
+        return self.db.get(ImportJob, job_id)
+
+    def get_words(self, job_id: str) -> list[ImportJobWord]:
+        stmt = select(ImportJobWord).where(ImportJobWord.job_id == job_id).order_by(ImportJobWord.position)
+        return list(self.db.exec(stmt).all())
+
+    def get_pending_words(self, job_id: str, limit: int) -> list[ImportJobWord]:
+        stmt = (
+            select(ImportJobWord)
+            .where(ImportJobWord.job_id == job_id, ImportJobWord.status == ImportWordStatus.PENDING)
+            .order_by(ImportJobWord.position)
+            .limit(limit)
+        )
+        return list(self.db.exec(stmt).all())
+
+    def get_unfinished_job_ids(self) -> list[str]:
+        stmt = select(ImportJob.id).where(ImportJob.status != ImportJobStatus.DONE).order_by(ImportJob.created_at)
+        return list(self.db.exec(stmt).all())
+
+    def set_status(self, job: ImportJob, status: ImportJobStatus) -> None:
+        job.status = status
+        job.updated_at = datetime.now()
+        self.db.add(job)
+        self.db.commit()
+
+    def save_progress(self, job: ImportJob, words: list[ImportJobWord]) -> None:
+        """Сохраняет результаты обработанной пачки слов одной транзакцией."""
+        job.processed += len(words)
+        job.updated_at = datetime.now()
+        self.db.add(job)
+        self.db.add_all(words)
+        self.db.commit()
@@ -1,28 +1,192 @@
 import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
 import urllib.parse
-from typing import Any, List
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Protocol
 
 import httpx
 from fastapi import HTTPException
 
 from app.core.config import settings
+from app.core.metrics import cache_requests, reverso_latency
+from app.core.resilience import CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket, backoff_delay
 from app.models.entities import Card
 
+logger = logging.getLogger(__name__)
 
-class HTTPReversoRepo:
+# Общее для всех запросов состояние защиты от медленного или недоступного Reverso
+_single_flight = SingleFlight()
+_rate_limiter = TokenBucket(settings.REVERSO_RATE_LIMIT, settings.REVERSO_BURST)
+_breaker = CircuitBreaker(settings.REVERSO_BREAKER_THRESHOLD, settings.REVERSO_BREAKER_RESET)
+_counters = {'calls': 0, 'upstream_requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'rate_limited': 0}
+# Запросы обрабатываются в пуле потоков: += над общим словарём без блокировки теряет приращения
+_counters_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
+
+
+class UpstreamError(Exception):
+    """Reverso ответил ошибкой, которую имеет смысл повторить (5xx или 429)."""
+
+
+def reverso_status() -> dict:
+    """Состояние размыкателя и счётчики обращений к Reverso."""
+    with _counters_lock:
+        counters = dict(_counters)
+    return {
+        'breaker': _breaker.state,
+        'consecutive_failures': _breaker.failures,
+        'coalesced': _single_flight.coalesced,
+        **counters,
+    }
+
+
+class DefinitionsProvider(Protocol):
+    """Источник статей Reverso (список DefsByWord) по слову; None - слово источнику неизвестно."""
+
+    def get_definitions(self, word: str) -> list[dict] | None: ...
+
+
+class HTTPDefinitionsProvider:
     def __init__(self, client: httpx.Client):
         self.client = client
 
-    def _get_definitions(self, request: str) -> Any:
-        encoded = urllib.parse.quote(request, safe='')
-        url = f'https://definition-api.reverso.net/v1/api/definitions/{settings.SOURCE_LANGUAGE}/{encoded}'
-        params = {'targetLang': settings.TARGET_LANGUAGE}
+    def _fetch(self, url: str, params: dict) -> Any:
+        _count('upstream_requests')
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = self.client.get(url, params=params)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise UpstreamError(f'HTTP {response.status_code}')
+            if not isinstance(payload := response.json(), dict):
+                raise ValueError(f'unexpected response: {type(payload).__name__}')
+            data = payload.get('DefsByWord', []) or []
+            outcome = 'ok'
+            return data
+        finally:
+            reverso_latency.observe(outcome, value=time.perf_counter() - start)
+
+    def _fetch_with_retries(self, url: str, params: dict) -> Any:
+        try:
+            _breaker.before_call()
+        except CircuitOpenError:
+            _count('rejected')
+            raise HTTPException(status_code=503, detail='Reverso is unavailable, try again later')
 
+        # Итог для размыкателя сообщается в finally при любом выходе: непредвиденное исключение тоже считается
+        # ошибкой, иначе пробный вызов в half_open никогда не завершится и размыкатель зависнет
+        outcome = _breaker.on_failure
         try:
-            data = self.client.get(url, params=params)
-            return data.json().get('DefsByWord', []) or []
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f'Reverso fetch failed: {e}')
+            for attempt in range(settings.REVERSO_RETRIES + 1):
+                if not _rate_limiter.acquire(timeout=settings.REVERSO_TIMEOUT):
+                    _count('rate_limited')
+                    # Наша собственная перегрузка не говорит о состоянии Reverso: только освобождаем пробу
+                    outcome = _breaker.release
+                    raise HTTPException(status_code=503, detail='Too many Reverso requests, try again later')
+                try:
+                    data = self._fetch(url, params)
+                except (httpx.HTTPError, UpstreamError, ValueError) as e:
+                    if attempt < settings.REVERSO_RETRIES:
+                        _count('retries')
+                        time.sleep(backoff_delay(attempt))
+                        continue
+                    _count('failures')
+                    logger.warning(f'Reverso недоступен после {attempt + 1} попыток: {e}')
+                    raise HTTPException(status_code=502, detail=f'Reverso fetch failed: {e}')
+                outcome = _breaker.on_success
+                return data
+        finally:
+            outcome()
+
+    def get_definitions(self, word: str) -> list[dict]:
+        encoded = urllib.parse.quote(word, safe='')
+        url = f'{settings.REVERSO_URL}/{settings.SOURCE_LANGUAGE}/{encoded}'
+        params = {'targetLang': settings.TARGET_LANGUAGE}
+
+        _count('calls')
+        # Одновременные запросы одного слова разделяют один вызов Reverso
+        return _single_flight.do(word, lambda: self._fetch_with_retries(url, params))
+
+
+class SnapshotDefinitionsProvider:
+    """
+    Локальный снимок ответов Reverso в SQLite-файле: слово -> JSON со списком DefsByWord.
+    Снимок собирается и обновляется скриптом build_snapshot.py.
+    """
+
+    def __init__(self, path: str | Path, writable: bool = False):
+        self.path = Path(path)
+        if writable:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS definitions '
+                '(lang TEXT NOT NULL, word TEXT NOT NULL, payload TEXT NOT NULL, fetched_at TEXT NOT NULL, '
+                'PRIMARY KEY (lang, word)) WITHOUT ROWID'
+            )
+        else:
+            self._conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            self._conn.execute('PRAGMA mmap_size = 268435456')
+        self._lang = f'{settings.SOURCE_LANGUAGE}-{settings.TARGET_LANGUAGE}'
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(word: str) -> str:
+        return word.strip().lower()
+
+    def get_definitions(self, word: str) -> list[dict] | None:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload FROM definitions WHERE word = ? AND lang = ?', (self._key(word), self._lang)
+            ).fetchone()
+        cache_requests.inc('reverso_snapshot', 'hit' if row else 'miss')
+        return json.loads(row[0]) if row else None
+
+    def words(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute('SELECT word FROM definitions WHERE lang = ? ORDER BY word', (self._lang,))
+            return [row[0] for row in rows]
+
+    def store(self, word: str, definitions: list[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO definitions (word, lang, payload, fetched_at) VALUES (?, ?, ?, ?)',
+                (self._key(word), self._lang, json.dumps(definitions, ensure_ascii=False), datetime.now().isoformat()),
+            )
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+
+class ChainDefinitionsProvider:
+    """Опрашивает источники по порядку и возвращает первый известный ответ."""
+
+    def __init__(self, providers: list[DefinitionsProvider]):
+        self.providers = providers
+
+    def get_definitions(self, word: str) -> list[dict] | None:
+        for provider in self.providers:
+            if (definitions := provider.get_definitions(word)) is not None:
+                return definitions
+        return None
+
+
+class ReversoRepo:
+    def __init__(self, provider: DefinitionsProvider):
+        self.provider = provider
+
+    def _get_definitions(self, request: str) -> list[dict]:
+        return self.provider.get_definitions(request) or []
 
     def get_cards(self, request: str) -> list[Card]:
         data = self._get_definitions(request)
@@ -89,3 +253,29 @@ class HTTPReversoRepo:
                         )
                     )
         return cards
+
+
+class HTTPReversoRepo(ReversoRepo):
+    """Карточки напрямую из Reverso по HTTP."""
+
+    def __init__(self, client: httpx.Client):
+        super().__init__(HTTPDefinitionsProvider(client))
+
+
+# Один клиент на процесс: переиспользует соединения и задаёт явный таймаут. Общий для API и фоновых заданий импорта
+http_client = httpx.Client(timeout=settings.REVERSO_TIMEOUT)
+
+
+@lru_cache
+def get_snapshot_provider() -> SnapshotDefinitionsProvider | None:
+    if not settings.REVERSO_SNAPSHOT_PATH or not Path(settings.REVERSO_SNAPSHOT_PATH).exists():
+        return None
+    return SnapshotDefinitionsProvider(settings.REVERSO_SNAPSHOT_PATH)
+
+
+def build_reverso_repo(client: httpx.Client = http_client) -> ReversoRepo:
+    """Репозиторий определений: сначала локальный снимок (если настроен), затем HTTP-запрос к Reverso."""
+    providers = [HTTPDefinitionsProvider(client)]
+    if snapshot := get_snapshot_provider():
+        providers.insert(0, snapshot)
+    return ReversoRepo(ChainDefinitionsProvider(providers))
@@ -1,96 +1,303 @@
+import threading
 from datetime import date, datetime, timedelta
 
-from app.models.entities import Card, CardStatus, Limits, Schedule, ScheduleAmount
+from app.core.dialect import day_of, day_start, minutes_between, tomorrow_start
+from app.core.metrics import cache_requests
+from app.models.entities import (
+    Card,
+    CardStatus,
+    History,
+    Limits,
+    Schedule,
+    ScheduleAmount,
+    ScheduleChange,
+    ScheduleCounts,
+)
+from app.models.read import CardRow, DayCount, DeckEntryRow, HardestCardRow, ScheduleRow, columns
 from app.models.user import User
-from sqlmodel import Session, func, select
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    case,
+    false,
+    literal,
+    text,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, delete, func, insert, select, update
+
+# Дневные лимиты в памяти процесса: (username, день) -> (new_limit, due_limit) или None, если строки ещё нет.
+# Сервис работает в одном воркере, поэтому достаточно сквозной записи в update_limits.
+_limits_cache: dict[tuple[str, date], tuple[int, int] | None] = {}
+_limits_lock = threading.Lock()
+
+
+def _cache_limits(
+    username: str, day: date, limits: tuple[int, int] | None, overwrite: bool = True
+) -> tuple[int, int] | None:
+    """
+    Кладёт лимиты в кэш и возвращает закэшированное значение. Без overwrite (промах в get_limits) запись
+    появляется, только если ключа всё ещё нет: иначе прочитанное до update_limits значение затёрло бы новое.
+    """
+    with _limits_lock:
+        # При смене дня выбрасываем записи за прошлые дни
+        for key in [key for key in _limits_cache if key[1] != day]:
+            del _limits_cache[key]
+        if overwrite:
+            _limits_cache[(username, day)] = limits
+            return limits
+        return _limits_cache.setdefault((username, day), limits)
+
+
+# Допустимые сортировки списка колоды; у каждой есть индекс (username, столбец), см. Schedule.__table_args__
+DECK_SORTS = {
+    'created': Schedule.created_at,
+    'ease': Schedule.ease,
+    'due': Schedule.due,
+}
+
+# Запросы горячих путей собраны один раз при импорте, значения передаются через параметры. Иначе на каждый
+# вызов заново строится дерево выражения и по нему считается ключ кэша компиляции.
+_SELECT_SCHEDULE = select(Schedule).where(
+    Schedule.card_id == bindparam('card_id'), Schedule.username == bindparam('username')
+)
+_EXISTS_SCHEDULE = select(Schedule.id).where(
+    Schedule.card_id == bindparam('card_id'), Schedule.username == bindparam('username')
+)
+_DELETE_CHANGE = delete(ScheduleChange).where(
+    ScheduleChange.username == bindparam('username'), ScheduleChange.card_id == bindparam('card_id')
+)
+# Курсор get_changes — id записи журнала, поэтому id должны появляться в порядке фиксации. В SQLite писатели
+# и так идут по одному. В PostgreSQL id выдаёт последовательность до фиксации: транзакция с меньшим id может
+# зафиксироваться позже, и клиент, уже получивший больший id как курсор, её пропустит. Поэтому перед записью
+# в журнал берётся транзакционная блокировка пользователя: его писатели журнала идут по одному до фиксации.
+_LOCK_CHANGES = text('SELECT pg_advisory_xact_lock(hashtext(:username))')
+_COUNT_DUE = select(func.count(Schedule.id)).where(
+    Schedule.username == bindparam('username'),
+    Schedule.status == CardStatus.DUE,
+    Schedule.due < bindparam('before'),
+)
+_SELECT_LIMITS = select(Limits).where(Limits.username == bindparam('username'), Limits.created_at == bindparam('day'))
+_SELECT_NEW = (
+    select(Schedule)
+    .where(Schedule.username == bindparam('username'), Schedule.status == CardStatus.NEW)
+    .order_by(func.random())
+    .limit(1)
+)
+_SELECT_CRAM = (
+    select(Schedule)
+    .where(Schedule.username == bindparam('username'), Schedule.status == CardStatus.CRAM)
+    .order_by(Schedule.due)
+    .limit(1)
+)
+_SELECT_DUE = (
+    select(Schedule)
+    .where(
+        Schedule.username == bindparam('username'),
+        Schedule.status == CardStatus.DUE,
+        Schedule.due < bindparam('before'),
+    )
+    .order_by(func.random())
+    .limit(1)
+)
+
+# Сколько id подставлять в один IN (...) при массовых операциях
+_BATCH_SIZE = 500
+
+# Столбец ScheduleCounts для каждого статуса
+_COUNT_COLUMNS = {
+    CardStatus.NEW: ScheduleCounts.new,
+    CardStatus.CRAM: ScheduleCounts.cram,
+    CardStatus.DUE: ScheduleCounts.due,
+}
+
+# Временная таблица для ScheduleRepo.update_states: перезапись расписаний одним UPDATE ... FROM
+_schedule_states = Table(
+    'schedule_states',
+    MetaData(),
+    Column('card_id', String, primary_key=True),
+    Column('interval_min', Integer),
+    Column('ease', Float),
+    Column('status', Schedule.__table__.c.status.type),
+    Column('due', DateTime),
+    prefixes=['TEMPORARY'],
+)
 
 
 class ScheduleRepo:
     def __init__(self, db: Session):
         self.db = db
 
+    def _lock_changes(self, username: str) -> None:
+        """Сериализует запись в журнал изменений пользователя до конца транзакции (только PostgreSQL)."""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            self.db.connection().execute(_LOCK_CHANGES, {'username': username})
+
+    def _record_change(self, username: str, card_id: str, deleted: bool = False) -> None:
+        """Пишет изменение в журнал в текущей транзакции, оставляя по карточке только последнюю запись."""
+        self._lock_changes(username)
+        self.db.exec(_DELETE_CHANGE, params={'username': username, 'card_id': card_id})
+        self.db.add(ScheduleChange(username=username, card_id=card_id, deleted=deleted))
+
+    def has_card(self, card_id: str, username: str) -> bool:
+        return self.db.exec(_EXISTS_SCHEDULE, params={'card_id': card_id, 'username': username}).first() is not None
+
     def add_card(self, card_id: str, username: str) -> None:
-        stmt = select(Schedule).where(Schedule.card_id == card_id, Schedule.username == username)
-        if not (self.db.exec(stmt).first()):
+        if not self.has_card(card_id, username):
             self.db.add(Schedule(card_id=card_id, username=username))
+            self._record_change(username, card_id)
+            self._adjust_counts(username, {CardStatus.NEW: 1})
             self.db.commit()
 
+    def add_cards(self, card_ids: list[str], username: str) -> None:
+        """Добавляет пачку карточек в расписание пользователя одной транзакцией."""
+        stmt = select(Schedule.card_id).where(Schedule.username == username, Schedule.card_id.in_(card_ids))
+        existing = set(self.db.exec(stmt).all()) if card_ids else set()
+        added = 0
+        for card_id in card_ids:
+            if card_id not in existing:
+                self.db.add(Schedule(card_id=card_id, username=username))
+                self._record_change(username, card_id)
+                existing.add(card_id)
+                added += 1
+        self._adjust_counts(username, {CardStatus.NEW: added})
+        self.db.commit()
+
     def get_schedule(self, card_id: str, username: str) -> Schedule | None:
-        stmt = select(Schedule).where(Schedule.card_id == card_id, Schedule.username == username)
-        return self.db.exec(stmt).first() or None
+        return self.db.exec(_SELECT_SCHEDULE, params={'card_id': card_id, 'username': username}).first() or None
 
-    def get_new_amount(self, username: str) -> int:
-        stmt = select(func.count(Schedule.id)).where(Schedule.username == username, Schedule.status == CardStatus.NEW)
-        return self.db.exec(stmt).first()
+    def get_due_amount(self, username: str) -> int:
+        # Карточка к повторению, если срок наступает не позже конца сегодняшнего дня.
+        # Зависит от времени, поэтому не хранится в счётчиках, а считается по диапазону индекса (username, status, due)
+        return self.db.exec(_COUNT_DUE, params={'username': username, 'before': tomorrow_start()}).first()
 
-    def get_cram_amount(self, username: str) -> int:
-        stmt = select(func.count(Schedule.id)).where(Schedule.username == username, Schedule.status == CardStatus.CRAM)
-        return self.db.exec(stmt).first()
+    def get_amount(self, username: str) -> ScheduleAmount:
+        counts = self.db.get(ScheduleCounts, username)
+        return ScheduleAmount(
+            new=counts.new if counts else 0,
+            cram=counts.cram if counts else 0,
+            due=self.get_due_amount(username),
+        )
 
-    def get_due_amount(self, username: str) -> int:
-        # Используем func.date() для извлечения даты из datetime и сравнения с текущей датой
-        # func.date('now') возвращает текущую дату в SQLite
-        stmt = select(func.count(Schedule.id)).where(
-            Schedule.username == username,
-            Schedule.status == CardStatus.DUE,
-            func.date(Schedule.due) <= func.date('now'),
+    def _adjust_counts(self, username: str, deltas: dict[CardStatus, int]) -> None:
+        """
+        Сдвигает счётчики статусов в текущей транзакции одним upsert: строка пользователя создаётся при первом
+        изменении. UPDATE с INSERT при rowcount == 0 гонялся бы с параллельной первой вставкой того же пользователя.
+        """
+        if not (deltas := {status: delta for status, delta in deltas.items() if delta}):
+            return
+        dialect = {'sqlite': sqlite, 'postgresql': postgresql}[self.db.get_bind().dialect.name]
+        stmt = dialect.insert(ScheduleCounts).values(
+            username=username, **{column.key: deltas.get(status, 0) for status, column in _COUNT_COLUMNS.items()}
+        )
+        self.db.exec(
+            stmt.on_conflict_do_update(
+                index_elements=[ScheduleCounts.username],
+                set_={_COUNT_COLUMNS[status].key: _COUNT_COLUMNS[status] + delta for status, delta in deltas.items()},
+            )
         )
-        return self.db.exec(stmt).first()
 
-    def get_amount(self, username: str) -> ScheduleAmount:
-        new = self.get_new_amount(username)
-        cram = self.get_cram_amount(username)
-        due = self.get_due_amount(username)
-        return ScheduleAmount(new=new, cram=cram, due=due)
+    def _count_statuses(self, username: str | None = None):
+        """select (username, new, cram, due), посчитанный по Schedule."""
+        stmt = select(
+            Schedule.username,
+            *[func.sum(case((Schedule.status == status, 1), else_=0)) for status in _COUNT_COLUMNS],
+        ).group_by(Schedule.username)
+        if username is not None:
+            stmt = stmt.where(Schedule.username == username)
+        return stmt
+
+    def rebuild_counts(self, username: str | None = None) -> None:
+        """Пересчитывает счётчики статусов по Schedule (одного пользователя или всех) в текущей транзакции."""
+        stmt = delete(ScheduleCounts)
+        if username is not None:
+            stmt = stmt.where(ScheduleCounts.username == username)
+        self.db.exec(stmt)
+        self.db.exec(
+            insert(ScheduleCounts).from_select(
+                ['username', *(column.key for column in _COUNT_COLUMNS.values())], self._count_statuses(username)
+            )
+        )
+
+    def check_counts(self) -> list[tuple[str, ScheduleAmount, ScheduleAmount]]:
+        """Пользователи, у которых счётчики разошлись с Schedule: (username, сохранённые, фактические)."""
+        stored = {
+            row.username: ScheduleAmount(new=row.new, cram=row.cram, due=row.due)
+            for row in self.db.exec(select(ScheduleCounts))
+        }
+        actual = {
+            username: ScheduleAmount(new=new, cram=cram, due=due)
+            for username, new, cram, due in self.db.exec(self._count_statuses())
+        }
+        return [
+            (username, stored.get(username, ScheduleAmount()), actual.get(username, ScheduleAmount()))
+            for username in sorted(stored.keys() | actual.keys())
+            if stored.get(username, ScheduleAmount()) != actual.get(username, ScheduleAmount())
+        ]
+
+    def backfill_counts(self) -> None:
+        """Заполняет пустую таблицу счётчиков (для баз, созданных до её появления)."""
+        if self.db.exec(select(ScheduleCounts.username).limit(1)).first() is None:
+            self.rebuild_counts()
+            self.db.commit()
 
     def get_limits(self, user: User) -> Limits:
-        # В SQLite поле DATE хранится как строка 'YYYY-MM-DD', сравниваем напрямую
+        """Лимиты на сегодня. Только чтение: строка в Limits появляется при первом ответе или увеличении лимита."""
         today = date.today()
-        stmt = select(Limits).where(Limits.username == user.username, Limits.created_at == today)
-        if not (result := self.db.exec(stmt).first()):
-            limits = Limits(username=user.username, new_limit=user.new_limit, due_limit=user.due_limit)
-            self.db.add(limits)
-            self.db.commit()
-            self.db.refresh(limits)
-            return limits
-        return result
+        key = (user.username, today)
+        with _limits_lock:
+            cached = _limits_cache.get(key, ...)
+        cache_requests.inc('limits', 'miss' if cached is ... else 'hit')
+        if cached is ...:
+            row = self.db.exec(_SELECT_LIMITS, params={'username': user.username, 'day': today}).first()
+            cached = _cache_limits(
+                user.username, today, (row.new_limit, row.due_limit) if row else None, overwrite=False
+            )
+        new_limit, due_limit = cached or (user.new_limit, user.due_limit)
+        return Limits(username=user.username, new_limit=new_limit, due_limit=due_limit, created_at=today)
 
     def get_new(self, username: str) -> Schedule | None:
-        stmt = (
-            select(Schedule)
-            .where(Schedule.username == username, Schedule.status == CardStatus.NEW)
-            .order_by(func.random())
-        )
-        return self.db.exec(stmt).first() or None
+        return self.db.exec(_SELECT_NEW, params={'username': username}).first() or None
 
     def get_cram(self, username: str) -> Schedule | None:
-        stmt = (
-            select(Schedule)
-            .where(Schedule.username == username, Schedule.status == CardStatus.CRAM)
-            .order_by(Schedule.due)
-        )
-        return self.db.exec(stmt).first() or None
+        return self.db.exec(_SELECT_CRAM, params={'username': username}).first() or None
 
     def get_due(self, username: str) -> Schedule | None:
-        # Используем func.date() для извлечения даты из datetime и сравнения с текущей датой
-        # func.date('now') возвращает текущую дату в SQLite
-        stmt = (
-            select(Schedule)
-            .where(
-                Schedule.username == username,
-                Schedule.status == CardStatus.DUE,
-                func.date(Schedule.due) <= func.date('now'),
-            )
-            .order_by(func.random())
+        # Карточка к повторению, если срок наступает не позже конца сегодняшнего дня
+        return self.db.exec(_SELECT_DUE, params={'username': username, 'before': tomorrow_start()}).first() or None
+
+    def get_session_card_ids(self, username: str, due_limit: int) -> list[str]:
+        """Карточки, которые почти наверняка покажут в сегодняшней сессии: CRAM и до due_limit просроченных DUE."""
+        cram = select(Schedule.card_id).where(Schedule.username == username, Schedule.status == CardStatus.CRAM)
+        due = (
+            select(Schedule.card_id)
+            .where(Schedule.username == username, Schedule.status == CardStatus.DUE, Schedule.due < tomorrow_start())
+            .limit(due_limit)
         )
-        return self.db.exec(stmt).first() or None
+        return list(self.db.exec(cram).all()) + list(self.db.exec(due).all())
 
-    def update_schedule(self, schedule: Schedule) -> None:
+    def update_schedule(self, schedule: Schedule, previous_status: CardStatus) -> None:
+        """Сохраняет расписание; previous_status — статус до изменения, по нему сдвигаются счётчики."""
+        if previous_status != schedule.status:
+            self._adjust_counts(schedule.username, {previous_status: -1, schedule.status: 1})
         self.db.add(schedule)
+        self._record_change(schedule.username, schedule.card_id)
         self.db.commit()
 
     def update_limits(self, user: User, status: CardStatus | str, amount: int) -> None:
-        limits = self.get_limits(user)
+        today = date.today()
+        if not (limits := self.db.exec(_SELECT_LIMITS, params={'username': user.username, 'day': today}).first()):
+            limits = Limits(
+                username=user.username, new_limit=user.new_limit, due_limit=user.due_limit, created_at=today
+            )
         # Поддерживаем как CardStatus enum, так и строки для обратной совместимости
         if isinstance(status, str):
             status = CardStatus(status)
@@ -99,68 +306,206 @@ class ScheduleRepo:
                 limits.new_limit += amount
             case CardStatus.DUE:
                 limits.due_limit += amount
+        updated = (limits.new_limit, limits.due_limit)
         self.db.add(limits)
         self.db.commit()
+        _cache_limits(user.username, today, updated)
 
-    def get_all_schedules(self, username: str) -> list[Schedule]:
-        stmt = select(Schedule).where(Schedule.username == username)
-        return list(self.db.exec(stmt).all())
+    def get_all_schedules(self, username: str) -> list[ScheduleRow]:
+        stmt = select(*columns(ScheduleRow, Schedule)).where(Schedule.username == username).order_by(Schedule.id)
+        return [ScheduleRow._make(row) for row in self.db.connection().execute(stmt)]
 
     def delete_schedule(self, card_id: str, username: str) -> None:
-        stmt = select(Schedule).where(Schedule.card_id == card_id, Schedule.username == username)
-        schedule = self.db.exec(stmt).first()
+        schedule = self.get_schedule(card_id, username)
         if schedule:
             self.db.delete(schedule)
+            self._record_change(username, card_id, deleted=True)
+            self._adjust_counts(username, {schedule.status: -1})
             self.db.commit()
 
+    def delete_schedules(self, username: str, card_ids: list[str], with_history: bool = False) -> list[str]:
+        """
+        Удаляет карточки из расписания пользователя (и, если with_history, их историю ответов) одной транзакцией.
+        Возвращает id карточек, которые действительно были в расписании.
+        """
+        deleted, now = [], datetime.now()
+        card_ids = list(dict.fromkeys(card_ids))
+        for start in range(0, len(card_ids), _BATCH_SIZE):
+            batch = card_ids[start : start + _BATCH_SIZE]
+            owned = (Schedule.username == username, Schedule.card_id.in_(batch))
+            rows = self.db.exec(select(Schedule.card_id, Schedule.status).where(*owned)).all()
+            if not rows:
+                continue
+            found = [card_id for card_id, _ in rows]
+            deltas: dict[CardStatus, int] = {}
+            for _, status in rows:
+                deltas[status] = deltas.get(status, 0) - 1
+            self.db.exec(delete(Schedule).where(*owned))
+            self._lock_changes(username)
+            self.db.exec(
+                delete(ScheduleChange).where(ScheduleChange.username == username, ScheduleChange.card_id.in_(found))
+            )
+            changes = [dict(username=username, card_id=card_id, deleted=True, created_at=now) for card_id in found]
+            self.db.exec(insert(ScheduleChange), params=changes)
+            if with_history:
+                self.db.exec(delete(History).where(History.username == username, History.card_id.in_(found)))
+            self._adjust_counts(username, deltas)
+            deleted.extend(found)
+        self.db.commit()
+        return deleted
+
     def has_other_users(self, card_id: str, exclude_username: str) -> bool:
         stmt = select(Schedule).where(Schedule.card_id == card_id, Schedule.username != exclude_username)
         return self.db.exec(stmt).first() is not None
 
-    def get_hardest_cards(self, username: str, limit: int = 10) -> list[dict]:
+    def get_hardest_cards(self, username: str, limit: int = 10) -> list[HardestCardRow]:
         stmt = (
-            select(Schedule, Card)
+            select(*columns(CardRow, Card), Schedule.ease)
             .join(Card, Schedule.card_id == Card.id)
             .where(Schedule.username == username)
             .order_by(Schedule.ease.asc())
             .limit(limit)
         )
-        results = self.db.exec(stmt).all()
-        return [
-            {
-                'card': {
-                    'id': card.id,
-                    'word': card.word,
-                    'translation': card.translation,
-                    'definition': card.definition,
-                    'meta': card.meta,
-                    'pronunciation': card.pronunciation,
-                    'example': card.example,
-                    'example_translation': card.example_translation,
-                    'created_at': card.created_at.isoformat() if card.created_at else None,
-                },
-                'ease': schedule.ease,
-            }
-            for schedule, card in results
-        ]
+        return [HardestCardRow(CardRow._make(row[:-1]), row[-1]) for row in self.db.connection().execute(stmt)]
+
+    def get_deck_page(
+        self,
+        username: str,
+        sort: str = 'created',
+        descending: bool = False,
+        status: CardStatus | None = None,
+        limit: int = 50,
+        after: tuple | None = None,
+    ) -> list[DeckEntryRow]:
+        """
+        Страница колоды пользователя с карточками. Keyset-пагинация: after — (значение сортировки, id расписания)
+        последней строки предыдущей страницы, поэтому любая страница читает из индекса только limit строк.
+        При сортировке по due новые карточки (без срока) не попадают в список.
+        """
+        key = DECK_SORTS[sort]
+        stmt = (
+            select(
+                Schedule.id, Schedule.status, Schedule.ease, Schedule.due, Schedule.interval_min, Schedule.created_at,
+                *columns(CardRow, Card),
+            )
+            .join(Card, Schedule.card_id == Card.id)
+            .where(Schedule.username == username)
+        )
+        if sort == 'due':
+            stmt = stmt.where(Schedule.due.is_not(None))
+        if status is not None:
+            stmt = stmt.where(Schedule.status == status)
+        if after:
+            position = tuple_(key, Schedule.id)
+            stmt = stmt.where(position < tuple_(*after) if descending else position > tuple_(*after))
+        order = (key.desc(), Schedule.id.desc()) if descending else (key, Schedule.id)
+        stmt = stmt.order_by(*order).limit(limit)
+        return [DeckEntryRow(*row[:6], CardRow._make(row[6:])) for row in self.db.connection().execute(stmt)]
 
-    def get_due_chart(self, username: str, days: int = 30) -> list[dict]:
+    def get_due_chart(self, username: str, days: int = 30) -> list[DayCount]:
         today = date.today()
         end_date = today + timedelta(days=days)
         stmt = (
             select(
-                func.date(Schedule.due).label('day'),
+                day_of(Schedule.due).label('day'),
                 func.count(Schedule.id).label('count'),
             )
             .where(
                 Schedule.username == username,
                 Schedule.status == CardStatus.DUE,
-                Schedule.due.isnot(None),
-                func.date(Schedule.due) >= today,
-                func.date(Schedule.due) <= end_date,
+                Schedule.due >= day_start(today),
+                Schedule.due < day_start(end_date + timedelta(days=1)),
             )
-            .group_by(func.date(Schedule.due))
-            .order_by(func.date(Schedule.due))
+            .group_by(day_of(Schedule.due))
+            .order_by(day_of(Schedule.due))
         )
-        results = self.db.exec(stmt).all()
-        return [{'date': str(row.day), 'count': row.count} for row in results]
+        return [DayCount(str(row.day), row.count) for row in self.db.exec(stmt)]
+
+    def get_scheduling_state(self, username: str, now: datetime) -> list[tuple]:
+        """
+        Строки (status, interval_min, ease, due) всех карточек пользователя: status — имя CardStatus, как оно
+        хранится в базе, due — минуты от now или None. Срок считается в SQL, а строки читаются Core-запросом
+        без преобразования типов: на сотнях тысяч карточек разбор datetime, Enum и ORM-обёртка строк
+        занимали больше времени, чем сама симуляция прогноза.
+        """
+        stmt = select(
+            type_coerce(Schedule.status, String),
+            Schedule.interval_min,
+            Schedule.ease,
+            minutes_between(literal(now, DateTime), Schedule.due),
+        ).where(Schedule.username == username)
+        return list(self.db.connection().execute(stmt))
+
+    def update_states(self, username: str, states: list[dict]) -> None:
+        """
+        Массово перезаписывает interval_min, ease, status и due карточек пользователя одной транзакцией.
+        states — словари с ключами card_id, interval_min, ease, status, due.
+        """
+        conn = self.db.connection()
+        # Временная таблица живёт до закрытия соединения; строки прошлых вызовов удаляем
+        _schedule_states.create(conn, checkfirst=True)
+        conn.execute(delete(_schedule_states))
+        conn.execute(insert(_schedule_states), states)
+        # Карточки, чьё расписание уже удалено (история осталась), не трогаем: иначе журнал потеряет их удаление
+        conn.execute(
+            delete(_schedule_states).where(
+                ~select(Schedule.id)
+                .where(Schedule.username == username, Schedule.card_id == _schedule_states.c.card_id)
+                .exists()
+            )
+        )
+        conn.execute(
+            update(Schedule)
+            .where(Schedule.username == username, Schedule.card_id == _schedule_states.c.card_id)
+            .values(
+                interval_min=_schedule_states.c.interval_min,
+                ease=_schedule_states.c.ease,
+                status=_schedule_states.c.status,
+                due=_schedule_states.c.due,
+            )
+        )
+        self._lock_changes(username)
+        conn.execute(
+            delete(ScheduleChange).where(
+                ScheduleChange.username == username, ScheduleChange.card_id.in_(select(_schedule_states.c.card_id))
+            )
+        )
+        conn.execute(
+            insert(ScheduleChange).from_select(
+                ['username', 'card_id', 'deleted', 'created_at'],
+                select(literal(username), _schedule_states.c.card_id, false(), literal(datetime.now())),
+            )
+        )
+        conn.execute(delete(_schedule_states))
+        self.rebuild_counts(username)
+        self.db.commit()
+
+    def get_changes(self, username: str, since: int, limit: int) -> tuple[list[ScheduleChange], bool]:
+        """
+        Изменения после курсора since в порядке их появления и признак, что есть ещё. id растут в порядке
+        фиксации благодаря _lock_changes, поэтому изменение не может появиться позади уже выданного курсора.
+        """
+        stmt = (
+            select(ScheduleChange)
+            .where(ScheduleChange.username == username, ScheduleChange.id > since)
+            .order_by(ScheduleChange.id)
+            .limit(limit + 1)
+        )
+        changes = list(self.db.exec(stmt).all())
+        return changes[:limit], len(changes) > limit
+
+    def get_schedules_by_card_ids(self, username: str, card_ids: list[str]) -> list[Schedule]:
+        stmt = select(Schedule).where(Schedule.username == username, Schedule.card_id.in_(card_ids))
+        return list(self.db.exec(stmt).all())
+
+    def backfill_changes(self) -> None:
+        """Заполняет пустой журнал изменений текущими расписаниями (для баз, созданных до его появления)."""
+        if self.db.exec(select(ScheduleChange.id).limit(1)).first() is not None:
+            return
+        self.db.exec(
+            insert(ScheduleChange).from_select(
+                ['username', 'card_id', 'deleted', 'created_at'],
+                select(Schedule.username, Schedule.card_id, false(), literal(datetime.now())).order_by(Schedule.id),
+            )
+        )
+        self.db.commit()
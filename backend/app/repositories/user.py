@@ -1,8 +1,10 @@
 import json
 import logging
+import threading
 from pathlib import Path
 
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.passwords import PasswordPoolBusyError, verify_password_async
 from app.models.user import User
 from fastapi import HTTPException
 
@@ -10,31 +12,53 @@ logger = logging.getLogger(__name__)
 
 # Путь к users.json относительно директории backend (где находится main.py)
 BACKEND_DIR = Path(__file__).parent.parent.parent
-USERS_FILE = BACKEND_DIR / 'users.json'
+USERS_FILE = Path(settings.USERS_FILE) if settings.USERS_FILE else BACKEND_DIR / 'users.json'
 
 # Логируем путь при загрузке модуля для отладки
 logger.info(f'Инициализация UsersRepo: путь к users.json = {USERS_FILE.absolute()}, существует = {USERS_FILE.exists()}')
 
 
+# Разобранный users.json: username -> запись. Перечитывается, только когда у файла меняются mtime или размер,
+# а не на каждый запрос с токеном.
+_users_index: dict[str, dict] = {}
+_users_stamp: tuple[int, int] | None = None
+_users_lock = threading.Lock()
+
+
+def load_users_index(path: Path = USERS_FILE) -> dict[str, dict]:
+    global _users_index, _users_stamp
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _users_lock:
+        if stamp != _users_stamp:
+            with open(path, 'r', encoding='utf-8') as f:
+                users = json.load(f)
+            index = {}
+            for user in users:
+                index.setdefault(user['username'], user)
+            _users_index, _users_stamp = index, stamp
+        return _users_index
+
+
 class UsersRepo:
     __path = USERS_FILE
 
-    def auth_user(self, username: str, password: str) -> User:
+    async def auth_user(self, username: str, password: str) -> User:
         try:
             if not self.__path.exists():
                 logger.error(f'Файл users.json не найден по пути: {self.__path}')
                 raise HTTPException(status_code=500, detail='Users file not found')
 
-            with open(self.__path, 'r', encoding='utf-8') as f:
-                users = json.load(f)
-
-            for user in users:
-                if user['username'] == username and verify_password(password, user['hashed_password']):
-                    logger.info(f'Успешная аутентификация пользователя: {username}')
-                    return User.model_validate(user)
+            user = load_users_index(self.__path).get(username)
+            if user and await verify_password_async(password, user['hashed_password']):
+                logger.info(f'Успешная аутентификация пользователя: {username}')
+                return User.model_validate(user)
 
             logger.warning(f'Неудачная попытка входа для пользователя: {username}')
             raise HTTPException(status_code=401, detail='Invalid credentials')
+        except PasswordPoolBusyError:
+            logger.warning(f'Очередь проверки паролей переполнена, вход отклонён: {username}')
+            raise HTTPException(status_code=503, detail='Too many login attempts', headers={'Retry-After': '1'})
         except HTTPException:
             raise
         except Exception as e:
@@ -47,12 +71,8 @@ class UsersRepo:
                 logger.error(f'Файл users.json не найден по пути: {self.__path}')
                 raise HTTPException(status_code=500, detail='Users file not found')
 
-            with open(self.__path, 'r', encoding='utf-8') as f:
-                users = json.load(f)
-
-            for user in users:
-                if user['username'] == username:
-                    return User.model_validate(user)
+            if user := load_users_index(self.__path).get(username):
+                return User.model_validate(user)
 
             raise HTTPException(status_code=404, detail='User not found')
         except HTTPException:
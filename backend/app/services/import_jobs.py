@@ -0,0 +1,100 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.resilience import backoff_delay
+from app.models.entities import Card, ImportJobStatus, ImportWordStatus
+from app.repositories.cards import CardsRepo
+from app.repositories.jobs import ImportJobsRepo
+from app.repositories.reverso import build_reverso_repo
+from app.repositories.schedule import ScheduleRepo
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix='import')
+# Прерывает паузы между повторами при остановке сервиса
+_stop = threading.Event()
+# Reverso недоступен (502 после повторов) или размыкатель открыт / превышена частота (503): слово не виновато
+_UPSTREAM_UNAVAILABLE = {502, 503}
+
+
+def _run_import_job(job_id: str) -> None:
+    with Session(engine) as db:
+        jobs_repo = ImportJobsRepo(db)
+        cards_repo = CardsRepo(db)
+        schedule_repo = ScheduleRepo(db)
+        reverso = build_reverso_repo()
+
+        if not (job := jobs_repo.get_job(job_id)) or job.status == ImportJobStatus.DONE:
+            return
+        username = job.username
+        jobs_repo.set_status(job, ImportJobStatus.RUNNING)
+
+        attempt = 0
+        while words := jobs_repo.get_pending_words(job_id, settings.IMPORT_BATCH_SIZE):
+            cards: list[Card] = []
+            processed = []
+            unavailable = None
+            for item in words:
+                try:
+                    found = reverso.get_cards(item.word.strip())
+                except Exception as e:
+                    if isinstance(e, HTTPException) and e.status_code in _UPSTREAM_UNAVAILABLE:
+                        unavailable = e
+                        break
+                    logger.warning(f'Импорт {job_id}: не удалось добавить слово {item.word}: {e}')
+                    found = []
+                cards.extend(found)
+                item.status = ImportWordStatus.ADDED if found else ImportWordStatus.FAILED
+                processed.append(item)
+
+            # Повторная обработка пачки после перезапуска безопасна: существующие строки пропускаются
+            cards_repo.create_cards(cards)
+            schedule_repo.add_cards([card.id for card in cards], username)
+            jobs_repo.save_progress(job, processed)
+
+            if unavailable is None:
+                attempt = 0
+                continue
+            # Остаток пачки остаётся PENDING и запрашивается снова после паузы, не дольше таймаута размыкателя
+            delay = backoff_delay(attempt, base=1.0, cap=settings.REVERSO_BREAKER_RESET)
+            attempt += 1
+            logger.warning(f'Импорт {job_id}: Reverso недоступен ({unavailable.detail}), повтор через {delay:.1f} с')
+            if _stop.wait(delay):
+                return
+
+        jobs_repo.set_status(job, ImportJobStatus.DONE)
+        logger.info(f'Импорт {job_id} завершён: {job.total} слов')
+
+
+def _run_logged(job_id: str) -> None:
+    try:
+        _run_import_job(job_id)
+    except Exception as e:
+        logger.error(f'Импорт {job_id} прерван: {e}', exc_info=True)
+
+
+def submit_import_job(job_id: str) -> None:
+    _executor.submit(_run_logged, job_id)
+
+
+def resume_import_jobs() -> None:
+    """Ставит в очередь задания, не завершённые до перезапуска."""
+    _stop.clear()
+    with Session(engine) as db:
+        job_ids = ImportJobsRepo(db).get_unfinished_job_ids()
+    for job_id in job_ids:
+        submit_import_job(job_id)
+    if job_ids:
+        logger.info(f'Возобновлено заданий импорта: {len(job_ids)}')
+
+
+def shutdown_import_jobs() -> None:
+    # Незавершённые задания останутся в БД и продолжатся после запуска
+    _stop.set()
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+"""
+Пересчёт расписаний по истории ответов: нужен, когда у пользователя меняются bonus/punishment
+(или сами правила), а накопленные Schedule посчитаны по старым параметрам.
+"""
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+
+from app.models.user import User
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+from app.services.scheduler import STATUSES, replay
+
+
+@dataclass
+class ReplayResult:
+    cards: int = 0
+    answers: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+    mean_ease: float | None = None
+
+
+def replay_user(
+    user: User, history_repo: HistoryRepo, schedule_repo: ScheduleRepo, dry_run: bool = False
+) -> ReplayResult:
+    """
+    Прогоняет все ответы пользователя через scheduler.replay с его текущими bonus/punishment
+    и перезаписывает Schedule карточек, у которых есть история. Срок — последний ответ плюс интервал.
+    """
+    sequences = history_repo.get_answer_sequences(user.username)
+    if not sequences:
+        return ReplayResult()
+
+    card_ids = np.array([card_id for card_id, _ in sequences], dtype=object)
+    answers = np.fromiter((answer for _, answer in sequences), dtype=bool, count=len(sequences))
+    starts = np.flatnonzero(np.concatenate(([True], card_ids[1:] != card_ids[:-1])))
+    lengths = np.diff(np.append(starts, len(card_ids)))
+
+    interval, ease, status = replay(answers, lengths, user.bonus, user.punishment)
+
+    last_answered = history_repo.get_last_answered(user.username)
+    states = []
+    for card_id, interval_min, card_ease, code in zip(
+        card_ids[starts], interval.astype(int).tolist(), ease.tolist(), status.tolist()
+    ):
+        states.append(
+            {
+                'card_id': card_id,
+                'interval_min': interval_min,
+                'ease': card_ease,
+                'status': STATUSES[code],
+                'due': last_answered[card_id] + timedelta(minutes=interval_min),
+            }
+        )
+    if not dry_run:
+        schedule_repo.update_states(user.username, states)
+
+    counts = np.bincount(status, minlength=len(STATUSES))
+    return ReplayResult(
+        cards=len(states),
+        answers=len(sequences),
+        statuses={status.name: int(count) for status, count in zip(STATUSES, counts)},
+        mean_ease=round(float(ease.mean()), 4),
+    )
@@ -0,0 +1,98 @@
+"""
+Правила интервального повторения без привязки к БД: переход состояния карточки по одному ответу
+(для маршрутов) и те же правила над массивами состояний (для прогноза и пересчёта истории).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.models.entities import CardStatus, Schedule
+
+# Лёгкость новой карточки — та же, что по умолчанию у расписания
+INITIAL_EASE = Schedule.model_fields['ease'].default
+MINUTES_PER_DAY = 60 * 24
+# Интервал растёт быстрее геометрической прогрессии (ease тоже растёт): уже после 14 правильных ответов
+# подряд срок уходит за пределы datetime. Потолок — сто лет: карточка фактически выучена, а срок
+# и interval_min остаются представимыми (в том числе в 32-битном INTEGER PostgreSQL)
+MAX_INTERVAL_MIN = 100 * 365 * MINUTES_PER_DAY
+
+# Коды статусов в массивах
+NEW, CRAM, DUE = 0, 1, 2
+STATUS_CODES = {CardStatus.NEW: NEW, CardStatus.CRAM: CRAM, CardStatus.DUE: DUE}
+STATUSES = [CardStatus.NEW, CardStatus.CRAM, CardStatus.DUE]
+
+
+@dataclass
+class ScheduleState:
+    interval_min: int | None
+    ease: float
+    status: CardStatus
+
+
+def next_state(state: ScheduleState, correct: bool, bonus: float, punishment: float) -> ScheduleState:
+    """Состояние карточки после ответа."""
+    if not correct:
+        return ScheduleState(interval_min=1, ease=state.ease * punishment, status=CardStatus.CRAM)
+
+    match state.interval_min:
+        case 10:
+            interval_min = MINUTES_PER_DAY
+        case None | 1:
+            interval_min = 10
+        case _:
+            interval_min = min(int(state.interval_min * state.ease), MAX_INTERVAL_MIN)
+    status = state.status
+    match status:
+        case CardStatus.NEW:
+            status = CardStatus.CRAM
+        case CardStatus.CRAM:
+            # Для перехода из CRAM в DUE интервал должен быть больше 10 минут
+            # (т.е. не первый правильный ответ после неправильного)
+            if interval_min > 10:
+                status = CardStatus.DUE
+    return ScheduleState(interval_min=interval_min, ease=state.ease * bonus, status=status)
+
+
+def step(
+    interval: np.ndarray, ease: np.ndarray, status: np.ndarray, correct: np.ndarray, bonus: float, punishment: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """next_state над массивами; отсутствующий интервал кодируется нулём."""
+    multiplied = np.minimum(np.floor(interval * ease), MAX_INTERVAL_MIN)
+    grown = np.where(interval <= 1, 10, np.where(interval == 10, MINUTES_PER_DAY, multiplied))
+    # Коды идут по порядку, поэтому NEW -> CRAM и CRAM -> DUE — это +1
+    promoted = correct & ((status == NEW) | ((status == CRAM) & (grown > 10)))
+    return (
+        np.where(correct, grown, 1),
+        ease * np.where(correct, bonus, punishment),
+        np.where(correct, status + promoted, CRAM).astype(np.int8, copy=False),
+    )
+
+
+def replay(
+    answers: np.ndarray, lengths: np.ndarray, bonus: float, punishment: float, initial_ease: float = INITIAL_EASE
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Итоговые состояния карточек после всех их ответов. answers — ответы, сгруппированные по карточкам
+    и упорядоченные по времени внутри группы, lengths — размеры групп. За раунд k каждая карточка,
+    у которой больше k ответов, получает свой k-й ответ, поэтому раундов столько, сколько ответов
+    у самой «долгой» карточки.
+    """
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    # Длинные группы вперёд: активные в раунде k карточки образуют префикс
+    order = np.argsort(-lengths, kind='stable')
+    starts, sorted_lengths = starts[order], lengths[order]
+
+    count = len(lengths)
+    interval = np.zeros(count)
+    ease = np.full(count, initial_ease)
+    status = np.zeros(count, dtype=np.int8)
+    for k in range(int(sorted_lengths[0]) if count else 0):
+        active = int(np.searchsorted(-sorted_lengths, -k, side='left'))
+        interval[:active], ease[:active], status[:active] = step(
+            interval[:active], ease[:active], status[:active], answers[starts[:active] + k], bonus, punishment
+        )
+
+    result = np.empty_like(interval), np.empty_like(ease), np.empty_like(status)
+    result[0][order], result[1][order], result[2][order] = interval, ease, status
+    return result
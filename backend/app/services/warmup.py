@@ -0,0 +1,110 @@
+"""
+Прогрев после старта: после рестарта первые запросы платят за холодные страницы SQLite, разбор users.json,
+компиляцию каждого SQL-выражения и чтение frontend/dist. Прогрев делает это заранее в фоне, а /health/ready
+отвечает 200 только после него, чтобы прокси не отправлял трафик на холодный экземпляр.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.user import User
+from app.repositories.cards import CardsRepo
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+from app.repositories.user import USERS_FILE, load_users_index
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+# Длительность каждого шага прогрева в секундах
+_report: dict[str, float] = {}
+# Файлы собранного фронтенда: путь относительно dist -> файл. Заполняется прогревом; serve_frontend отдаёт
+# их без проверок файловой системы на каждый запрос
+frontend_manifest: dict[str, Path] = {}
+
+_CHUNK_SIZE = 1 << 20
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warmup_report() -> dict[str, float]:
+    return dict(_report)
+
+
+def _preload_database() -> None:
+    """Читает файл SQLite (и WAL) в кэш страниц ОС, не больше WARMUP_PRELOAD_MB."""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+    budget = settings.WARMUP_PRELOAD_MB << 20
+    for path in (Path(engine.url.database), Path(f'{engine.url.database}-wal')):
+        if not path.exists():
+            continue
+        with open(path, 'rb') as f:
+            while budget > 0 and (chunk := f.read(min(_CHUNK_SIZE, budget))):
+                budget -= len(chunk)
+
+
+def _prepare_statements() -> None:
+    """
+    Выполняет запросы горячих путей для каждого пользователя: SQLAlchemy кэширует их компиляцию,
+    SQLite читает нужные индексы, а карточки сегодняшней сессии попадают в LRU-кэш.
+    """
+    with Session(engine) as db:
+        schedule_repo, history_repo, cards_repo = ScheduleRepo(db), HistoryRepo(db), CardsRepo(db)
+        for record in load_users_index(USERS_FILE).values():
+            user = User.model_validate(record)
+            schedule_repo.get_amount(user.username)
+            limits = schedule_repo.get_limits(user)
+            schedule_repo.get_new(user.username)
+            schedule_repo.get_cram(user.username)
+            schedule_repo.get_due(user.username)
+            schedule_repo.get_deck_page(user.username)
+            history_repo.get_today_stats(user.username)
+            cards_repo.prefetch(schedule_repo.get_session_card_ids(user.username, limits.due_limit))
+
+
+def _load_frontend(frontend_dist: Path) -> None:
+    """Составляет список файлов фронтенда и читает их в кэш страниц ОС."""
+    if not frontend_dist.exists():
+        return
+    manifest = {}
+    for path in frontend_dist.rglob('*'):
+        if path.is_file():
+            path.read_bytes()
+            manifest[path.relative_to(frontend_dist).as_posix()] = path
+    frontend_manifest.update(manifest)
+
+
+def run_warmup(frontend_dist: Path) -> None:
+    """Выполняет шаги прогрева по очереди. Ошибка шага только логируется: холодный экземпляр лучше недоступного."""
+    steps = {
+        'users': lambda: load_users_index(USERS_FILE),
+        'database': _preload_database,
+        'statements': _prepare_statements,
+        'frontend': lambda: _load_frontend(frontend_dist),
+    }
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f'Прогрев: шаг {name} завершился ошибкой: {e}', exc_info=True)
+        _report[name] = round(time.perf_counter() - started, 3)
+    _ready.set()
+    logger.info(f'Прогрев завершён за {sum(_report.values()):.2f} с: {_report}')
+
+
+def start_warmup(frontend_dist: Path) -> None:
+    """Запускает прогрев в фоне; если он выключен (WARMUP_ENABLED=false), экземпляр сразу готов."""
+    if not settings.WARMUP_ENABLED:
+        _ready.set()
+        return
+    threading.Thread(target=run_warmup, args=(frontend_dist,), name='warmup', daemon=True).start()
@@ -0,0 +1,165 @@
+"""
+Генератор синтетических баз для бенчмарков: пользователи, карточки, расписания и история ответов
+с реалистичным распределением статусов и сроков.
+"""
+
+import hashlib
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import Engine, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.entities import Card, CardStatus, History, Schedule
+from app.repositories.schedule import ScheduleRepo
+
+# Доли статусов в зрелой колоде: большая часть уже на повторении, немного новых и в зубрёжке
+STATUS_WEIGHTS = {CardStatus.NEW: 0.25, CardStatus.CRAM: 0.05, CardStatus.DUE: 0.70}
+BATCH_SIZE = 10_000
+
+_SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sta', 'tor', 've', 'xi', 'zu', 'pre', 'ing', 'tion', 'al', 'er']
+
+
+def _word(rng: random.Random) -> str:
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_card(rng: random.Random, index: int) -> dict:
+    word = f'{_word(rng)}{index}'
+    translation = ', '.join(_word(rng) for _ in range(rng.randint(1, 3)))
+    return {
+        'id': hashlib.sha256(f'{word}_{translation}'.encode()).hexdigest(),
+        'word': word,
+        'translation': translation,
+        'definition': ' '.join(_word(rng) for _ in range(rng.randint(4, 12))),
+        'meta': rng.choice(['noun', 'verb', 'adjective', 'noun, formal', None]),
+        'pronunciation': f'ˈ{_word(rng)}',
+        'example': ' '.join(_word(rng) for _ in range(rng.randint(5, 10))) if rng.random() < 0.8 else None,
+        'example_translation': ' '.join(_word(rng) for _ in range(6)) if rng.random() < 0.7 else None,
+        'created_at': datetime.now() - timedelta(days=rng.uniform(0, 365)),
+    }
+
+
+def make_schedule(rng: random.Random, username: str, card_id: str, now: datetime) -> dict:
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    ease = min(3.5, max(1.3, rng.gauss(2.5, 0.4)))
+    match status:
+        case CardStatus.NEW:
+            due, interval_min = None, None
+        case CardStatus.CRAM:
+            interval_min = rng.choice([1, 10])
+            due = now + timedelta(minutes=rng.uniform(-30, interval_min))
+        case _:
+            interval_min = int(60 * 24 * rng.expovariate(1 / 20)) + 60 * 24
+            # Около 10% просрочено, остальные распределены по интервалу вперёд
+            offset = rng.uniform(-3, 0) if rng.random() < 0.1 else rng.uniform(0, interval_min / (60 * 24))
+            due = now + timedelta(days=offset)
+    return {
+        'username': username,
+        'card_id': card_id,
+        'ease': ease,
+        'due': due,
+        'interval_min': interval_min,
+        'status': status,
+        'created_at': now - timedelta(days=rng.uniform(0, 365)),
+    }
+
+
+def make_history(rng: random.Random, username: str, card_id: str, now: datetime, accuracy: float) -> dict:
+    return {
+        'username': username,
+        'card_id': card_id,
+        'answer': rng.random() < accuracy,
+        'created_at': now - timedelta(days=rng.betavariate(1, 3) * 365),
+    }
+
+
+def _insert(engine: Engine, table, rows: list[dict]) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(table), rows)
+
+
+def generate_database(
+    path: str | Path,
+    schedules: int,
+    users: int = 3,
+    history_per_card: float = 2.0,
+    accuracy: float = 0.85,
+    seed: int = 42,
+) -> Engine:
+    """
+    Создаёт SQLite-базу с schedules строк расписания, поровну распределённых между users пользователями
+    (user0, user1, ...), и примерно history_per_card ответами на карточку. Возвращает движок этой базы.
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    engine = create_engine(f'sqlite:///{path}')
+    SQLModel.metadata.create_all(engine)
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    per_user = max(1, schedules // users)
+    # Часть карточек общая для всех пользователей (как при импорте одного списка слов классом)
+    shared = [make_card(rng, i) for i in range(per_user // 2)]
+    if shared:
+        _insert(engine, Card.__table__, shared)
+
+    card_index = len(shared)
+    for user in range(users):
+        username = f'user{user}'
+        own = [make_card(rng, card_index + i) for i in range(per_user - len(shared))]
+        card_index += len(own)
+        for start in range(0, len(own), BATCH_SIZE):
+            _insert(engine, Card.__table__, own[start : start + BATCH_SIZE])
+
+        card_ids = [card['id'] for card in shared] + [card['id'] for card in own]
+        for start in range(0, len(card_ids), BATCH_SIZE):
+            batch = card_ids[start : start + BATCH_SIZE]
+            _insert(engine, Schedule.__table__, [make_schedule(rng, username, card_id, now) for card_id in batch])
+
+        answers = int(len(card_ids) * history_per_card)
+        for start in range(0, answers, BATCH_SIZE):
+            rows = [
+                make_history(rng, username, rng.choice(card_ids), now, accuracy)
+                for _ in range(min(BATCH_SIZE, answers - start))
+            ]
+            _insert(engine, History.__table__, rows)
+
+    # Строки вставлены в обход репозитория: счётчики статусов считаем по готовому Schedule, как init_db
+    with Session(engine) as db:
+        ScheduleRepo(db).rebuild_counts()
+        db.commit()
+    return engine
+
+
+def make_reverso_payload(rng: random.Random, word: str) -> list[dict]:
+    """Ответ Reverso (DefsByWord) той же структуры, что и у настоящего API."""
+    frequencies = ['VeryCommon', 'VeryCommon', 'Common', 'Rare']
+    return [
+        {
+            'word': word,
+            'pronounceIpa': f'ˈ{_word(rng)}, {_word(rng)}',
+            'DefsByPos': [
+                {
+                    'Pos': pos,
+                    'Defs': [
+                        {
+                            'Def': ' '.join(_word(rng) for _ in range(rng.randint(4, 12))),
+                            'frequency': rng.choice(frequencies),
+                            'registerExt': rng.choice([None, None, 'Formal', 'Dated']),
+                            'translations': [{'translation': _word(rng)} for _ in range(rng.randint(1, 4))],
+                            'examples': [
+                                {
+                                    'example': ' '.join(_word(rng) for _ in range(6)),
+                                    'translations': [{'translation': f'<em>{_word(rng)}</em> {_word(rng)}'}],
+                                }
+                            ],
+                        }
+                        for _ in range(rng.randint(1, 6))
+                    ],
+                }
+                for pos in rng.sample(['noun', 'verb', 'adjective', 'adverb'], rng.randint(1, 3))
+            ],
+        }
+    ]
@@ -0,0 +1,100 @@
+"""
+Сравнение ORM-пути и моделей чтения (app/models/read.py) по времени и пиковой памяти.
+Использование (из директории backend):
+    python -m benchmarks.read_models --schedules 100000 --output bench_read.json
+Все строки базы принадлежат одному пользователю, чтобы запросы читали все schedules строк.
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from sqlmodel import Session, select
+
+from app.models.entities import Card, Schedule
+from app.repositories.cards import CardsRepo
+from app.repositories.schedule import ScheduleRepo
+from benchmarks.deck import generate_database
+from benchmarks.run import git_commit, measure
+
+
+def peak_memory(fn: Callable[[], object]) -> tuple[int, int]:
+    """Пиковая память вызова и размер результата, пока он жив, в байтах (по tracemalloc)."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def bench(args: argparse.Namespace, workdir: Path) -> list[dict]:
+    started = time.perf_counter()
+    engine = generate_database(workdir / 'bench_read.db', args.schedules, users=1, history_per_card=0)
+    print(f'база сгенерирована за {time.perf_counter() - started:.1f} с')
+
+    username = 'user0'
+    results = []
+    with Session(engine) as db:
+        schedule_repo, cards_repo = ScheduleRepo(db), CardsRepo(db)
+        cases: dict[str, Callable[[], object]] = {
+            'orm.schedules': lambda: [s.model_dump() for s in db.exec(select(Schedule).where(Schedule.username == username)).all()],
+            'read.schedules': lambda: schedule_repo.get_all_schedules(username),
+            'orm.cards': lambda: [
+                card.model_dump()
+                for _, card in db.exec(
+                    select(Schedule, Card).join(Card, Card.id == Schedule.card_id).where(Schedule.username == username)
+                ).all()
+            ],
+            'read.cards': lambda: cards_repo.get_user_card_rows(username),
+            'read.hardest_cards': lambda: schedule_repo.get_hardest_cards(username, 20),
+        }
+        for name, fn in cases.items():
+            # ORM-объекты живут в identity map сессии: без сброса следующие прогоны меряли бы кэш
+            timing = measure(lambda: (fn(), db.expunge_all()), args.repeat)
+            db.expunge_all()
+            peak, retained = peak_memory(fn)
+            db.expunge_all()
+            result = {
+                'name': name,
+                'scale': args.schedules,
+                **timing,
+                'peak_mb': round(peak / 2**20, 2),
+                'retained_mb': round(retained / 2**20, 2),
+            }
+            print(f'{name}: median {result["median_ms"]} мс, пик {result["peak_mb"]} МБ, результат {result["retained_mb"]} МБ')
+            results.append(result)
+    engine.dispose()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Модели чтения против ORM')
+    parser.add_argument('--schedules', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workdir', help='куда складывать сгенерированную базу (по умолчанию временная директория)')
+    parser.add_argument('--output', default='bench_read.json')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = bench(args, workdir)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nРезультаты записаны в {args.output}')
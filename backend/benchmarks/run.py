@@ -0,0 +1,162 @@
+"""
+Микробенчмарки репозиториев на синтетических базах.
+Использование (из директории backend):
+    python -m benchmarks.run --scales 1000,10000,100000 --output bench.json
+    python -m benchmarks.run --scales 1000000 --repeat 3 --payloads recorded/   # записанные ответы Reverso
+Результаты пишутся в JSON, чтобы сравнивать прогоны между коммитами.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from fastapi import UploadFile
+from sqlmodel import Session
+
+from app.api.v1.backup import export_backup, import_backup
+from app.models.user import User
+from app.repositories.cards import CardsRepo
+from app.repositories.history import HistoryRepo
+from app.repositories.reverso import ReversoRepo
+from app.repositories.schedule import ScheduleRepo
+from benchmarks.deck import generate_database, make_reverso_payload
+
+
+class StaticDefinitionsProvider:
+    """Отдаёт заранее записанные ответы Reverso по кругу."""
+
+    def __init__(self, payloads: list[list[dict]]):
+        self.payloads = payloads
+        self.position = 0
+
+    def get_definitions(self, word: str) -> list[dict]:
+        self.position = (self.position + 1) % len(self.payloads)
+        return self.payloads[self.position]
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    fn()  # прогрев: компиляция выражений, кэш страниц SQLite
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 4),
+        'median_ms': round(statistics.median(timings), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'max_ms': round(max(timings), 4),
+    }
+
+
+def load_payloads(directory: str | None, count: int = 200) -> list[list[dict]]:
+    if directory:
+        payloads = []
+        for path in sorted(Path(directory).glob('*.json')):
+            data = json.loads(path.read_text(encoding='utf-8'))
+            payloads.append(data.get('DefsByWord', []) if isinstance(data, dict) else data)
+        return payloads
+    rng = random.Random(0)
+    return [make_reverso_payload(rng, f'word{i}') for i in range(count)]
+
+
+async def _read_body(response) -> str:
+    return ''.join([chunk async for chunk in response.body_iterator])
+
+
+def export_and_import(user: User, cards_repo: CardsRepo, schedule_repo: ScheduleRepo) -> None:
+    response = export_backup(user, cards_repo, schedule_repo)
+    body = asyncio.run(_read_body(response))
+    upload = UploadFile(io.BytesIO(body.encode()), filename='backup.csv')
+    import_backup(upload, user, cards_repo, schedule_repo)
+
+
+def bench_scale(scale: int, args: argparse.Namespace, workdir: Path) -> list[dict]:
+    started = time.perf_counter()
+    engine = generate_database(workdir / f'bench_{scale}.db', scale, args.users, args.history_per_card)
+    print(f'[{scale}] база сгенерирована за {time.perf_counter() - started:.1f} с')
+
+    user = User(username='user0')
+    results = []
+    with Session(engine) as db:
+        schedule_repo, history_repo, cards_repo = ScheduleRepo(db), HistoryRepo(db), CardsRepo(db)
+        cases: dict[str, Callable[[], object]] = {
+            'schedule.get_amount': lambda: schedule_repo.get_amount(user.username),
+            'schedule.get_new': lambda: schedule_repo.get_new(user.username),
+            'schedule.get_due': lambda: schedule_repo.get_due(user.username),
+            'schedule.get_cram': lambda: schedule_repo.get_cram(user.username),
+            'schedule.get_hardest_cards': lambda: schedule_repo.get_hardest_cards(user.username, 20),
+            'schedule.get_due_chart': lambda: schedule_repo.get_due_chart(user.username, 30),
+            'history.get_activity_data': lambda: history_repo.get_activity_data(user.username, 365),
+            'history.get_today_stats': lambda: history_repo.get_today_stats(user.username),
+            'backup.export_import': lambda: export_and_import(user, cards_repo, schedule_repo),
+        }
+        for name, fn in cases.items():
+            if name in args.skip:
+                continue
+            # Выгрузка большой колоды на порядки медленнее точечных запросов
+            repeat = max(1, args.repeat // 5) if name.startswith('backup.') else args.repeat
+            result = {'name': name, 'scale': scale, **measure(fn, repeat)}
+            print(f'[{scale}] {name}: median {result["median_ms"]} мс')
+            results.append(result)
+            db.rollback()
+    engine.dispose()
+    return results
+
+
+def bench_reverso_parse(args: argparse.Namespace) -> dict:
+    payloads = load_payloads(args.payloads)
+    repo = ReversoRepo(StaticDefinitionsProvider(payloads))
+    result = measure(lambda: [repo.get_cards('word') for _ in payloads], args.repeat)
+    result = {'name': 'reverso.get_cards', 'scale': len(payloads), **result}
+    print(f'reverso.get_cards ({len(payloads)} ответов): median {result["median_ms"]} мс')
+    return result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Бенчмарки репозиториев Flips')
+    parser.add_argument('--scales', default='1000,10000,100000', help='число строк Schedule, через запятую')
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--history-per-card', type=float, default=2.0)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--payloads', help='директория с записанными ответами Reverso (*.json)')
+    parser.add_argument('--skip', default='', help='имена бенчмарков через запятую, которые пропустить')
+    parser.add_argument('--workdir', help='куда складывать сгенерированные базы (по умолчанию временная директория)')
+    parser.add_argument('--output', default='bench.json')
+    args = parser.parse_args()
+    args.skip = set(filter(None, args.skip.split(',')))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = [bench_reverso_parse(args)]
+        for scale in (int(value) for value in args.scales.split(',')):
+            results.extend(bench_scale(scale, args, workdir))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nРезультаты записаны в {args.output}')
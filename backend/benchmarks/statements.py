@@ -0,0 +1,120 @@
+"""
+Накладные расходы Python на горячие запросы: выражение, собранное на каждый вызов (как раньше в репозиториях),
+против собранного один раз с bindparam. База маленькая, чтобы время выполнения в SQLite не заслоняло разницу.
+Использование (из директории backend):
+    python -m benchmarks.statements --schedules 1000 --calls 2000 --output bench_statements.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from sqlmodel import Session, func, select
+
+from app.core.dialect import today_start, tomorrow_start
+from app.models.entities import CardStatus, History, Schedule
+from app.models.user import User
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+from benchmarks.deck import generate_database
+from benchmarks.run import git_commit
+
+
+def per_call_us(fn: Callable[[], object], calls: int, repeat: int) -> dict:
+    """Медиана и минимум времени одного вызова в микросекундах по repeat прогонам из calls вызовов."""
+    for _ in range(calls // 10):
+        fn()  # прогрев: кэш компиляции SQLAlchemy, страницы SQLite
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    return {
+        'calls': calls,
+        'runs': repeat,
+        'min_us': round(min(timings), 2),
+        'median_us': round(statistics.median(timings), 2),
+    }
+
+
+def bench(args: argparse.Namespace, workdir: Path) -> list[dict]:
+    engine = generate_database(workdir / 'bench_statements.db', args.schedules, users=1)
+    user = User(username='user0')
+    results = []
+    with Session(engine) as db:
+        schedule_repo, history_repo = ScheduleRepo(db), HistoryRepo(db)
+        card_id = db.exec(select(Schedule.card_id).limit(1)).first()
+
+        # Те же запросы, что строились в репозиториях на каждый вызов до перехода на собранные выражения
+        inline = {
+            'schedule.get_schedule': lambda: db.exec(
+                select(Schedule).where(Schedule.card_id == card_id, Schedule.username == user.username)
+            ).first(),
+            'schedule.get_cram': lambda: db.exec(
+                select(Schedule)
+                .where(Schedule.username == user.username, Schedule.status == CardStatus.CRAM)
+                .order_by(Schedule.due)
+                .limit(1)
+            ).first(),
+            'schedule.get_due_amount': lambda: db.exec(
+                select(func.count(Schedule.id)).where(
+                    Schedule.username == user.username,
+                    Schedule.status == CardStatus.DUE,
+                    Schedule.due < tomorrow_start(),
+                )
+            ).first(),
+            'history.get_today_stats': lambda: db.exec(
+                select(func.count(History.id), func.min(History.created_at), func.max(History.created_at)).where(
+                    History.username == user.username,
+                    History.created_at >= today_start(),
+                    History.created_at < tomorrow_start(),
+                )
+            ).first(),
+        }
+        prepared = {
+            'schedule.get_schedule': lambda: schedule_repo.get_schedule(card_id, user.username),
+            'schedule.get_cram': lambda: schedule_repo.get_cram(user.username),
+            'schedule.get_due_amount': lambda: schedule_repo.get_due_amount(user.username),
+            'history.get_today_stats': lambda: history_repo.get_today_stats(user.username),
+        }
+        for name in inline:
+            before = per_call_us(inline[name], args.calls, args.repeat)
+            after = per_call_us(prepared[name], args.calls, args.repeat)
+            db.expunge_all()
+            saved = round(before['median_us'] - after['median_us'], 2)
+            print(f'{name}: {before["median_us"]} -> {after["median_us"]} мкс на вызов ({saved} мкс экономии)')
+            results.append({'name': name, 'scale': args.schedules, 'inline': before, 'prepared': after})
+    engine.dispose()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Собранные заранее запросы против построенных на каждый вызов')
+    parser.add_argument('--schedules', type=int, default=1000)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workdir', help='куда складывать сгенерированную базу (по умолчанию временная директория)')
+    parser.add_argument('--output', default='bench_statements.json')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = bench(args, workdir)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nРезультаты записаны в {args.output}')
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Скрипт для сборки и обновления локального снимка словаря Reverso.
+Использование:
+    python3 build_snapshot.py words.txt              # добавить в снимок слова из файла (по одному на строку)
+    python3 build_snapshot.py words.txt --refresh    # перезапросить и уже имеющиеся слова
+    python3 build_snapshot.py --refresh              # обновить все слова снимка
+Путь к снимку берётся из REVERSO_SNAPSHOT_PATH или задаётся параметром --snapshot.
+"""
+
+import argparse
+import sys
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.repositories.reverso import HTTPDefinitionsProvider, SnapshotDefinitionsProvider
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сборка локального снимка словаря Reverso')
+    parser.add_argument('words', nargs='?', help='файл со словами, по одному на строку')
+    parser.add_argument('--snapshot', default=settings.REVERSO_SNAPSHOT_PATH, help='путь к файлу снимка')
+    parser.add_argument('--refresh', action='store_true', help='перезапросить слова, уже имеющиеся в снимке')
+    args = parser.parse_args()
+
+    if not args.snapshot:
+        sys.exit('Укажите путь к снимку: --snapshot или REVERSO_SNAPSHOT_PATH')
+
+    snapshot = SnapshotDefinitionsProvider(args.snapshot, writable=True)
+    if args.words:
+        with open(args.words, encoding='utf-8') as f:
+            words = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    elif args.refresh:
+        words = snapshot.words()
+    else:
+        parser.error('нужен файл со словами или --refresh')
+
+    http = HTTPDefinitionsProvider(httpx.Client(timeout=settings.REVERSO_TIMEOUT))
+    fetched = skipped = failed = 0
+    for i, word in enumerate(words, 1):
+        if not args.refresh and snapshot.get_definitions(word) is not None:
+            skipped += 1
+            continue
+        try:
+            snapshot.store(word, http.get_definitions(word))
+            fetched += 1
+        except HTTPException as e:
+            print(f'  {word}: {e.detail}')
+            failed += 1
+        if i % 100 == 0:
+            snapshot.commit()
+            print(f'{i}/{len(words)}')
+    snapshot.commit()
+
+    print(f'\nЗагружено: {fetched}, пропущено (уже в снимке): {skipped}, ошибок: {failed}')
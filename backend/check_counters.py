@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Скрипт для проверки счётчиков статусов (ScheduleCounts) по таблице Schedule.
+Использование:
+    python3 check_counters.py              # показать пользователей с расхождениями
+    python3 check_counters.py --rebuild    # пересчитать счётчики всех пользователей
+"""
+
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app.core.database import engine, init_db
+from app.repositories.schedule import ScheduleRepo
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Проверка счётчиков статусов карточек')
+    parser.add_argument('--rebuild', action='store_true', help='пересчитать счётчики по Schedule')
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as db:
+        schedule_repo = ScheduleRepo(db)
+        mismatches = schedule_repo.check_counts()
+        for username, stored, actual in mismatches:
+            print(f'{username}: сохранено {stored.model_dump()}, в Schedule {actual.model_dump()}')
+        if not mismatches:
+            print('Счётчики совпадают с Schedule')
+        elif args.rebuild:
+            schedule_repo.rebuild_counts()
+            db.commit()
+            print(f'\nСчётчики пересчитаны ({len(mismatches)} пользователей с расхождениями)')
+        else:
+            sys.exit(1)
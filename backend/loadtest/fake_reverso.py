@@ -0,0 +1,81 @@
+"""
+Локальная заглушка Reverso Definition API с настраиваемой задержкой и ошибками.
+Использование (из директории backend):
+    python -m loadtest.fake_reverso --port 8090 --latency-ms 150 --error-rate 0.05
+и REVERSO_URL=http://127.0.0.1:8090 для приложения.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.deck import make_reverso_payload
+
+
+class FakeReversoServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, latency_ms: float, jitter_ms: float, error_rate: float, hang_rate: float):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name='fake-reverso', daemon=True)
+        thread.start()
+        return thread
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeReversoServer
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        delay = max(0.0, random.gauss(server.latency_ms, server.jitter_ms)) / 1000
+        roll = random.random()
+        if roll < server.hang_rate:
+            # Имитируем зависший upstream: дольше любого разумного таймаута клиента
+            time.sleep(60)
+        time.sleep(delay)
+        if roll < server.hang_rate + server.error_rate:
+            self.send_response(random.choice([500, 502, 503, 429]))
+            self.end_headers()
+            return
+
+        word = urllib.parse.unquote(urllib.parse.urlparse(self.path).path.rsplit('/', 1)[-1])
+        # Ответ детерминирован по слову, как у настоящего API
+        body = json.dumps({'DefsByWord': make_reverso_payload(random.Random(word), word)}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Заглушка Reverso для нагрузочного тестирования')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--hang-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeReversoServer(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.hang_rate)
+    print(f'Заглушка Reverso слушает {server.url}')
+    server.serve_forever()
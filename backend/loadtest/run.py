@@ -0,0 +1,296 @@
+"""
+Сквозное нагрузочное тестирование по HTTP: приложение поднимается отдельным процессом uvicorn на
+сгенерированной SQLite-базе и заглушке Reverso, виртуальные пользователи проходят сценарии
+(вход, учебные сессии next/answer, загрузка дашборда, добавление слов).
+Использование (из директории backend):
+    python -m loadtest.run --schedules 30000 --users 3 --concurrency 20 --duration 60
+    python -m loadtest.run --reverso-latency-ms 400 --reverso-error-rate 0.1 --output loadtest.json
+По каждому маршруту выводятся p50/p95/p99, пропускная способность и число ошибок.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import bcrypt
+import httpx
+
+from benchmarks.deck import generate_database
+from benchmarks.run import git_commit
+from loadtest.fake_reverso import FakeReversoServer
+
+PASSWORD = 'loadtest'
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Веса сценариев: в основном учатся, реже смотрят статистику и ещё реже добавляют слова
+SCENARIO_WEIGHTS = {'study': 0.7, 'dashboard': 0.2, 'create': 0.1}
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Counter = field(default_factory=Counter)
+
+    def record(self, route: str, elapsed: float, status: int | None) -> None:
+        self.latencies[route].append(elapsed * 1000)
+        if status is None or status >= 400:
+            self.errors[(route, status or 'transport')] += 1
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, username: str, stats: Stats, rng: random.Random):
+        self.client = client
+        self.username = username
+        self.stats = stats
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+
+    async def request(self, method: str, route: str, url: str | None = None, **kwargs) -> httpx.Response | None:
+        """Запрос с замером; route — шаблон маршрута для группировки в отчёте."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url or route, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(f'{method} {route}', time.perf_counter() - start, None)
+            return None
+        self.stats.record(f'{method} {route}', time.perf_counter() - start, response.status_code)
+        return response
+
+    async def login(self) -> bool:
+        data = {'username': self.username, 'password': PASSWORD}
+        response = await self.request('POST', '/api/v1/auth/login', data=data)
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {'Authorization': f'Bearer {response.json()["access_token"]}'}
+        return True
+
+    async def study(self, accuracy: float) -> None:
+        await self.request('GET', '/api/v1/study/stats')
+        for _ in range(self.rng.randint(5, 30)):
+            response = await self.request('GET', '/api/v1/study/next')
+            if response is None or response.status_code != 200 or not (card := response.json()):
+                return
+            # Время на обдумывание ответа
+            await asyncio.sleep(self.rng.uniform(0.05, 0.3))
+            answer = {'card_id': card['id'], 'answer': self.rng.random() < accuracy}
+            await self.request('POST', '/api/v1/study/answer', json=answer)
+
+    async def dashboard(self) -> None:
+        await asyncio.gather(
+            self.request('GET', '/api/v1/stats/overview'),
+            self.request('GET', '/api/v1/stats/hardest'),
+            self.request('GET', '/api/v1/stats/due-chart'),
+            self.request('GET', '/api/v1/stats/activity'),
+            self.request('GET', '/api/v1/stats/today'),
+        )
+
+    async def create(self) -> None:
+        if self.rng.random() < 0.5:
+            word = f'load{self.rng.randrange(1_000_000)}'
+            await self.request('POST', '/api/v1/cards/create', params={'word': word})
+        else:
+            words = [f'load{self.rng.randrange(1_000_000)}' for _ in range(self.rng.randint(3, 10))]
+            await self.request('POST', '/api/v1/cards/bulk-create', json={'words': words})
+
+    async def run(self, deadline: float, accuracy: float) -> None:
+        if not await self.login():
+            return
+        scenarios, weights = list(SCENARIO_WEIGHTS), list(SCENARIO_WEIGHTS.values())
+        while time.monotonic() < deadline:
+            match self.rng.choices(scenarios, weights=weights)[0]:
+                case 'study':
+                    await self.study(accuracy)
+                case 'dashboard':
+                    await self.dashboard()
+                case 'create':
+                    await self.create()
+
+
+def percentile(values: list[float], q: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+def build_report(stats: Stats, elapsed: float) -> list[dict]:
+    routes = []
+    errors_by_route = Counter()
+    for (route, _), count in stats.errors.items():
+        errors_by_route[route] += count
+    for route, values in sorted(stats.latencies.items()):
+        routes.append(
+            {
+                'route': route,
+                'requests': len(values),
+                'rps': round(len(values) / elapsed, 2),
+                'errors': errors_by_route[route],
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'max_ms': round(max(values), 2),
+            }
+        )
+    return routes
+
+
+def print_report(routes: list[dict], stats: Stats, elapsed: float) -> None:
+    print(f'\n{"маршрут":<36} {"запросов":>9} {"rps":>8} {"ошибок":>7} {"p50":>9} {"p95":>9} {"p99":>9}')
+    for row in routes:
+        print(
+            f'{row["route"]:<36} {row["requests"]:>9} {row["rps"]:>8} {row["errors"]:>7} '
+            f'{row["p50_ms"]:>9} {row["p95_ms"]:>9} {row["p99_ms"]:>9}'
+        )
+    total = sum(row['requests'] for row in routes)
+    print(f'\nВсего {total} запросов за {elapsed:.1f} с ({total / elapsed:.1f} rps), ошибок {sum(stats.errors.values())}')
+    for (route, status), count in stats.errors.most_common():
+        print(f'  {route}: {status} x{count}')
+
+
+def write_users(path: Path, users: int, rounds: int) -> None:
+    # Один хэш на всех: генерация bcrypt-хэшей не должна занимать время подготовки
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    records = [
+        {
+            'username': f'user{i}',
+            'hashed_password': hashed,
+            'bonus': 1.05,
+            'punishment': 0.8,
+            'new_limit': 20,
+            'due_limit': 200,
+        }
+        for i in range(users)
+    ]
+    path.write_text(json.dumps(records, indent=2), encoding='utf-8')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port: int, env: dict[str, str], log_path: Path) -> subprocess.Popen:
+    command = [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port)]
+    log = open(log_path, 'w', encoding='utf-8')
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env}, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'Приложение завершилось с кодом {process.returncode}')
+            try:
+                # Готов после прогрева, а не при первом открытом порте
+                if (await client.get('/health/ready')).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError('Приложение не поднялось вовремя')
+
+
+async def drive(base_url: str, args: argparse.Namespace) -> tuple[Stats, float]:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        start = time.monotonic()
+        deadline = start + args.duration
+        tasks = []
+        for i in range(args.concurrency):
+            rng = random.Random(args.seed + i)
+            user = VirtualUser(client, f'user{i % args.users}', stats, rng)
+            tasks.append(asyncio.create_task(user.run(deadline, args.accuracy)))
+            # Плавный разгон, чтобы все не входили в одну миллисекунду
+            await asyncio.sleep(args.ramp_up / args.concurrency)
+        await asyncio.gather(*tasks)
+        return stats, time.monotonic() - start
+
+
+def main(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        generate_database(workdir / 'loadtest.db', args.schedules, args.users, args.history_per_card).dispose()
+        write_users(workdir / 'users.json', args.users, args.bcrypt_rounds)
+        print(f'База на {args.schedules} расписаний сгенерирована за {time.perf_counter() - started:.1f} с')
+
+        reverso = FakeReversoServer(
+            0, args.reverso_latency_ms, args.reverso_jitter_ms, args.reverso_error_rate, args.reverso_hang_rate
+        )
+        reverso.start_in_background()
+
+        port = free_port()
+        env = {
+            'DB_URL': f'sqlite:///{workdir / "loadtest.db"}',
+            'USERS_FILE': str(workdir / 'users.json'),
+            'REVERSO_URL': reverso.url,
+            'REVERSO_SNAPSHOT_PATH': '',
+        }
+        process = start_app(port, env, workdir / 'app.log')
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            asyncio.run(wait_ready(base_url, process))
+            print(f'Нагрузка: {args.concurrency} виртуальных пользователей, {args.duration} с')
+            stats, elapsed = asyncio.run(drive(base_url, args))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+            reverso.shutdown()
+            reverso.server_close()
+
+        routes = build_report(stats, elapsed)
+        print_report(routes, stats, elapsed)
+        print(f'Запросов к заглушке Reverso: {reverso.requests}')
+        return {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('output', 'workdir')},
+            'elapsed_s': round(elapsed, 2),
+            'requests': sum(row['requests'] for row in routes),
+            'errors': {f'{route} {status}': count for (route, status), count in stats.errors.items()},
+            'routes': routes,
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Нагрузочное тестирование Flips по HTTP')
+    parser.add_argument('--schedules', type=int, default=30_000, help='число строк Schedule в базе')
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--history-per-card', type=float, default=2.0)
+    parser.add_argument('--concurrency', type=int, default=20, help='число виртуальных пользователей')
+    parser.add_argument('--duration', type=float, default=60, help='длительность нагрузки, с')
+    parser.add_argument('--ramp-up', type=float, default=5, help='время разгона, с')
+    parser.add_argument('--timeout', type=float, default=30, help='таймаут HTTP-запроса, с')
+    parser.add_argument('--accuracy', type=float, default=0.85, help='доля правильных ответов')
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--reverso-latency-ms', type=float, default=150)
+    parser.add_argument('--reverso-jitter-ms', type=float, default=50)
+    parser.add_argument('--reverso-error-rate', type=float, default=0.0)
+    parser.add_argument('--reverso-hang-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workdir', help='куда складывать базу, users.json и лог приложения')
+    parser.add_argument('--output', default='loadtest.json')
+    args = parser.parse_args()
+
+    report = main(args)
+    Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'\nОтчёт записан в {args.output}')
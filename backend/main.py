@@ -4,10 +4,14 @@ from pathlib import Path
 import uvicorn
 from app.api import router as api_router
 from app.core.config import settings
-from app.core.database import init_db
+from app.core import metrics, profiler
+from app.core.database import analytics_engine, engine, init_db, start_analytics_snapshots, stop_analytics_snapshots
+from app.core.passwords import shutdown_password_pool, start_password_pool
+from app.services import warmup
+from app.services.import_jobs import resume_import_jobs, shutdown_import_jobs
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 # Настройка логирования
@@ -18,6 +22,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# Путь к собранному фронтенду
+frontend_dist = Path(__file__).parent.parent / 'frontend' / 'dist'
+
 
 @app.on_event('startup')
 async def startup_event():
@@ -28,6 +35,17 @@ async def startup_event():
     except Exception as e:
         logger.error(f'Ошибка при инициализации базы данных: {e}', exc_info=True)
         raise
+    start_analytics_snapshots()
+    resume_import_jobs()
+    start_password_pool()
+    warmup.start_warmup(frontend_dist)
+
+
+@app.on_event('shutdown')
+async def shutdown_event():
+    shutdown_import_jobs()
+    shutdown_password_pool()
+    stop_analytics_snapshots()
 
 
 @app.exception_handler(Exception)
@@ -51,8 +69,30 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 # API routes (важно что это идёт ПЕРЕД статикой)
 app.include_router(api_router, prefix='/api')
 
-# Путь к собранному фронтенду
-frontend_dist = Path(__file__).parent.parent / 'frontend' / 'dist'
+if settings.SQL_PROFILER_ENABLED:
+    profiler.instrument_engine(engine)
+    if analytics_engine is not engine:
+        profiler.instrument_engine(analytics_engine)
+    app.add_middleware(profiler.SQLProfilerMiddleware)
+
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    if analytics_engine is not engine:
+        metrics.instrument_engine(analytics_engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def get_metrics():
+        return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/health/ready', include_in_schema=False)
+async def health_ready():
+    """Готовность принимать трафик: 503, пока идёт прогрев после старта."""
+    if not warmup.is_ready():
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={'status': 'warming_up'})
+    return {'status': 'ready', 'warmup': warmup.warmup_report()}
+
 
 if frontend_dist.exists():
     # Раздаём статические файлы из папки assets
@@ -65,6 +105,13 @@ if frontend_dist.exists():
         if full_path.startswith('api/'):
             return JSONResponse(status_code=404, content={'detail': 'Not found'})
 
+        # Файлы из списка, составленного прогревом, отдаём без обхода путей. После повторной сборки фронтенда
+        # файла из списка может уже не быть: запись выбрасываем и идём обычным путём
+        if (known_file := warmup.frontend_manifest.get(full_path.lstrip('/'))) is not None:
+            if known_file.is_file():
+                return FileResponse(str(known_file))
+            warmup.frontend_manifest.pop(full_path.lstrip('/'), None)
+
         # Проверяем, существует ли запрашиваемый файл в dist
         requested_file = frontend_dist / full_path.lstrip('/')
 
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Скрипт для пересчёта расписаний по истории ответов (например, после изменения bonus/punishment в users.json).
+Использование:
+    python3 replay_history.py                          # все пользователи из истории
+    python3 replay_history.py alice bob --dry-run      # только посчитать и показать итог
+    python3 replay_history.py alice --bonus 1.1        # пересчитать с другими параметрами
+"""
+
+import argparse
+import time
+
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.core.database import engine, init_db
+from app.models.user import User
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+from app.repositories.user import user_repo
+from app.services.replay import replay_user
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Пересчёт расписаний по истории ответов')
+    parser.add_argument('usernames', nargs='*', help='пользователи (по умолчанию все, у кого есть история)')
+    parser.add_argument('--bonus', type=float, help='вместо bonus из users.json')
+    parser.add_argument('--punishment', type=float, help='вместо punishment из users.json')
+    parser.add_argument('--dry-run', action='store_true', help='ничего не записывать')
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as db:
+        history_repo, schedule_repo = HistoryRepo(db), ScheduleRepo(db)
+        for username in args.usernames or history_repo.get_usernames():
+            try:
+                user = user_repo.get_user_by_username(username)
+            except HTTPException:
+                # Пользователя уже нет в users.json: параметры по умолчанию
+                user = User(username=username)
+            if args.bonus is not None:
+                user.bonus = args.bonus
+            if args.punishment is not None:
+                user.punishment = args.punishment
+
+            started = time.perf_counter()
+            result = replay_user(user, history_repo, schedule_repo, dry_run=args.dry_run)
+            print(
+                f'{username}: {result.answers} ответов, {result.cards} карточек за {time.perf_counter() - started:.2f} с; '
+                f'статусы {result.statuses}, средний ease {result.mean_ease}'
+            )
+
+    if args.dry_run:
+        print('\nПробный прогон: расписания не изменены')
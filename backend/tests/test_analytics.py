@@ -0,0 +1,33 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core import database
+from app.core.config import settings
+
+
+def test_analytics_engine_is_read_only(client, headers):
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=headers)
+
+    with database.analytics_engine.connect() as conn:
+        assert conn.execute(text('SELECT count(*) FROM schedule')).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text('DELETE FROM schedule'))
+
+
+def test_snapshot_copies_main_database(client, headers, tmp_path, monkeypatch):
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=headers)
+    target = tmp_path / 'analytics.db'
+    monkeypatch.setattr(settings, 'ANALYTICS_SNAPSHOT_PATH', str(target))
+
+    database.refresh_analytics_snapshot()
+
+    snapshot = sqlite3.connect(target)
+    try:
+        assert snapshot.execute('SELECT word FROM card').fetchall() == [('apple',)]
+        assert snapshot.execute('PRAGMA journal_mode').fetchone() == ('delete',)
+    finally:
+        snapshot.close()
+    assert not target.with_name(target.name + '.tmp').exists()
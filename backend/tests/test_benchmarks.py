@@ -0,0 +1,31 @@
+import random
+
+from sqlmodel import Session, func, select
+
+from app.models.entities import Schedule
+from app.repositories.reverso import ReversoRepo
+from app.repositories.schedule import ScheduleRepo
+from benchmarks.deck import generate_database, make_reverso_payload
+
+
+class PayloadProvider:
+    def __init__(self, payload: list[dict]):
+        self.payload = payload
+
+    def get_definitions(self, word: str) -> list[dict]:
+        return self.payload
+
+
+def test_generated_database_is_consistent(tmp_path):
+    engine = generate_database(tmp_path / 'deck.db', schedules=300, users=3, history_per_card=1.0)
+    with Session(engine) as db:
+        per_user = dict(db.exec(select(Schedule.username, func.count()).group_by(Schedule.username)).all())
+        assert per_user == {'user0': 100, 'user1': 100, 'user2': 100}
+        assert ScheduleRepo(db).check_counts() == []
+    engine.dispose()
+
+
+def test_generated_payload_parses_into_cards():
+    payload = make_reverso_payload(random.Random(1), 'word')
+    cards = ReversoRepo(PayloadProvider(payload)).get_cards('word')
+    assert cards and all(card.word == 'word' for card in cards)
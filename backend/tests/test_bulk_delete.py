@@ -0,0 +1,35 @@
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.core.security import create_access_token
+from app.models.entities import History
+
+
+def _card_ids(client, headers) -> dict[str, str]:
+    cards = client.get('/api/v1/cards/changes', headers=headers).json()['cards']
+    return {card['word']: card['id'] for card in cards}
+
+
+def test_bulk_delete_removes_schedules_history_and_orphans(client, headers):
+    bob = {'Authorization': f'Bearer {create_access_token("bob")}'}
+    for word in ('apple', 'pear'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=bob)
+    ids = _card_ids(client, headers)
+    client.post('/api/v1/study/answer', json={'card_id': ids['pear'], 'answer': True}, headers=headers)
+    with Session(engine) as db:
+        assert len(db.exec(select(History).where(History.username == 'alice')).all()) == 1
+
+    response = client.post(
+        '/api/v1/study/cards/bulk-delete',
+        json={'card_ids': [ids['apple'], ids['pear'], 'unknown'], 'with_history': True},
+        headers=headers,
+    )
+
+    assert response.json() == {'deleted': 2}
+    assert _card_ids(client, headers) == {}
+    # apple остаётся у bob, pear больше ни в одном расписании — собрана фоновой задачей после ответа
+    assert client.get(f'/api/v1/cards/{ids["apple"]}', headers=bob).status_code == 200
+    assert client.get(f'/api/v1/cards/{ids["pear"]}', headers=bob).status_code == 404
+    with Session(engine) as db:
+        assert db.exec(select(History).where(History.username == 'alice')).all() == []
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import delete
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.entities import Card
+from app.repositories import cards as cards_module
+from app.repositories.cards import CardsRepo
+from conftest import make_card
+
+
+def test_card_is_cached_privately_by_etag(client, headers):
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=headers)
+    card_id = client.get('/api/v1/cards/changes', headers=headers).json()['cards'][0]['id']
+
+    response = client.get(f'/api/v1/cards/{card_id}', headers=headers)
+    assert response.json()['word'] == 'apple'
+    assert response.headers['Cache-Control'] == 'private, max-age=3600'
+    assert response.headers['ETag'] != f'"{card_id}"'
+
+    cached = client.get(f'/api/v1/cards/{card_id}', headers={**headers, 'If-None-Match': response.headers['ETag']})
+    assert (cached.status_code, cached.content) == (304, b'')
+    assert cached.headers['Cache-Control'].startswith('private')
+
+    assert client.get(f'/api/v1/cards/{card_id}').status_code == 401
+
+
+def test_card_outside_schedule_is_not_found_even_with_etag(client, headers):
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=headers)
+    card_id = client.get('/api/v1/cards/changes', headers=headers).json()['cards'][0]['id']
+    etag = client.get(f'/api/v1/cards/{card_id}', headers=headers).headers['ETag']
+    bob = {'Authorization': f'Bearer {create_access_token("bob")}'}
+
+    for request_headers in (bob, {**bob, 'If-None-Match': etag}):
+        assert client.get(f'/api/v1/cards/{card_id}', headers=request_headers).status_code == 404
+    assert client.get('/api/v1/cards/missing', headers={**headers, 'If-None-Match': '"missing"'}).status_code == 404
+
+
+def test_card_cache_keeps_recently_used_cards(db, monkeypatch):
+    monkeypatch.setattr(cards_module, '_card_cache', OrderedDict())
+    monkeypatch.setattr(settings, 'CARD_CACHE_SIZE', 2)
+    cards_repo = CardsRepo(db)
+    cards_repo.create_cards([make_card(card_id) for card_id in ('a', 'b', 'c')])
+
+    cards_repo.prefetch(['a', 'b'])
+    cards_repo.get_card('a')
+    cards_repo.get_card('c')
+    assert list(cards_module._card_cache) == ['a', 'c']
+
+    # Карточка из кэша отдаётся без обращения к базе; удаление через репозиторий вытесняет её
+    db.exec(delete(Card).where(Card.id == 'a'))
+    db.commit()
+    assert cards_repo.get_card('a').word == 'a'
+    cards_repo.delete_card('c')
+    with pytest.raises(HTTPException):
+        cards_repo.get_card('c')
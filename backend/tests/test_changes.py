@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+from sqlmodel import Session
+
+from app.repositories.schedule import ScheduleRepo
+
+
+def test_changes_page_through_cursor_with_tombstones(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['a', 'b', 'c'], 'alice')
+    schedule_repo.add_card('x', 'bob')
+    schedule_repo.delete_schedule('a', 'alice')
+    schedule_repo.delete_schedules('alice', ['b'])
+
+    first, has_more = schedule_repo.get_changes('alice', 0, 2)
+    assert has_more
+    rest, has_more = schedule_repo.get_changes('alice', first[-1].id, 2)
+    assert not has_more
+
+    # По карточке остаётся одна, последняя запись; удаление — надгробие deleted=True
+    assert [(change.card_id, change.deleted) for change in first + rest] == [
+        ('c', False),
+        ('a', True),
+        ('b', True),
+    ]
+
+
+def test_changes_endpoint_returns_cards_and_deleted_ids(client, headers):
+    for word in ('apple', 'pear'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+    page = client.get('/api/v1/cards/changes', headers=headers).json()
+    assert sorted(card['word'] for card in page['cards']) == ['apple', 'pear']
+
+    pear = next(card for card in page['cards'] if card['word'] == 'pear')
+    client.delete(f'/api/v1/study/cards/{pear["id"]}', headers=headers)
+    delta = client.get('/api/v1/cards/changes', params={'since': page['cursor']}, headers=headers).json()
+    assert (delta['deleted'], delta['cards'], delta['has_more']) == ([pear['id']], [], False)
+
+
+@pytest.mark.parametrize('engine', ['postgresql'], indirect=True)
+def test_change_log_writers_are_serialized_on_postgres(engine):
+    """Второй писатель журнала ждёт фиксации первого, поэтому id растут в порядке фиксации."""
+    with Session(engine) as first, Session(engine) as second:
+        first_repo = ScheduleRepo(first)
+        first_repo._record_change('alice', 'a')
+        first.flush()
+
+        done = threading.Event()
+        writer = threading.Thread(target=lambda: (ScheduleRepo(second).add_card('b', 'alice'), done.set()))
+        writer.start()
+        assert not done.wait(0.3)
+
+        first.commit()
+        writer.join(5)
+        assert done.is_set()
+
+    with Session(engine) as db:
+        changes, _ = ScheduleRepo(db).get_changes('alice', 0, 10)
+    assert [change.card_id for change in changes] == ['a', 'b']
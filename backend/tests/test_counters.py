@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from app.models.entities import CardStatus, ScheduleCounts
+from app.repositories.schedule import ScheduleRepo
+
+
+def _amount(schedule_repo: ScheduleRepo) -> dict:
+    return schedule_repo.get_amount('alice').model_dump()
+
+
+def test_counters_follow_schedule_changes(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['a', 'b', 'c', 'd'], 'alice')
+    schedule_repo.add_card('a', 'alice')
+    assert _amount(schedule_repo) == {'new': 4, 'cram': 0, 'due': 0}
+
+    schedule = schedule_repo.get_schedule('a', 'alice')
+    schedule.status, schedule.interval_min, schedule.due = CardStatus.CRAM, 10, datetime.now()
+    schedule_repo.update_schedule(schedule, CardStatus.NEW)
+    schedule = schedule_repo.get_schedule('b', 'alice')
+    schedule.status, schedule.interval_min, schedule.due = CardStatus.DUE, 1440, datetime.now()
+    schedule_repo.update_schedule(schedule, CardStatus.NEW)
+    # Срок через неделю: в счётчике DUE есть, но к повторению сегодня не относится
+    schedule = schedule_repo.get_schedule('c', 'alice')
+    schedule.status, schedule.interval_min, schedule.due = CardStatus.DUE, 10080, datetime.now() + timedelta(days=7)
+    schedule_repo.update_schedule(schedule, CardStatus.NEW)
+    assert _amount(schedule_repo) == {'new': 1, 'cram': 1, 'due': 1}
+    assert db.get(ScheduleCounts, 'alice').due == 2
+
+    schedule_repo.delete_schedule('a', 'alice')
+    schedule_repo.delete_schedules('alice', ['b', 'd', 'unknown'])
+    assert _amount(schedule_repo) == {'new': 0, 'cram': 0, 'due': 0}
+    assert schedule_repo.check_counts() == []
+
+
+def test_rebuild_repairs_drifted_counters(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['a', 'b'], 'alice')
+    counts = db.get(ScheduleCounts, 'alice')
+    counts.new = 7
+    db.add(counts)
+    db.commit()
+
+    [(username, stored, actual)] = schedule_repo.check_counts()
+    assert (username, stored.new, actual.new) == ('alice', 7, 2)
+
+    schedule_repo.rebuild_counts()
+    db.commit()
+    assert schedule_repo.check_counts() == []
@@ -0,0 +1,71 @@
+import base64
+import json
+
+import pytest
+
+from app.repositories.cards import CardsRepo
+from app.repositories.schedule import ScheduleRepo
+from conftest import make_card
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_keyset_pages_cover_deck_once_with_ties(db, descending):
+    card_ids = [f'card-{i}' for i in range(7)]
+    CardsRepo(db).create_cards([make_card(card_id) for card_id in card_ids])
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(card_ids, 'alice')
+    schedule_repo.add_card('card-0', 'bob')
+    # Одинаковый ease у нескольких карточек: порядок внутри них задаёт id
+    for card_id, ease in zip(card_ids, [2.5, 1.3, 2.5, 1.3, 3.0, 2.5, 1.3]):
+        schedule = schedule_repo.get_schedule(card_id, 'alice')
+        schedule.ease = ease
+        schedule_repo.update_schedule(schedule, schedule.status)
+
+    pages, after = [], None
+    while page := schedule_repo.get_deck_page('alice', 'ease', descending, limit=3, after=after):
+        pages.append(page)
+        after = (page[-1].ease, page[-1].schedule_id)
+
+    rows = [row for page in pages for row in page]
+    keys = [(row.ease, row.schedule_id) for row in rows]
+    assert keys == sorted(keys, reverse=descending)
+    assert sorted(row.card.id for row in rows) == card_ids
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+
+def test_deck_endpoint_follows_cursor(client, headers):
+    for word in ('apple', 'pear', 'plum'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+
+    words, cursor = [], None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/v1/cards', params=params, headers=headers).json()
+        words += [entry['card']['word'] for entry in page['entries']]
+        if not (cursor := page['next_cursor']):
+            break
+    assert sorted(words) == ['apple', 'pear', 'plum'] and len(words) == 3
+
+    first = client.get('/api/v1/cards', params={'limit': 1}, headers=headers).json()['next_cursor']
+    assert client.get('/api/v1/cards', params={'sort': 'ease', 'cursor': first}, headers=headers).status_code == 400
+    assert client.get('/api/v1/cards', params={'cursor': 'garbage'}, headers=headers).status_code == 400
+
+
+@pytest.mark.parametrize(
+    'sort, key',
+    [
+        ('ease', ['ease', 'abc', 1]),
+        ('ease', ['ease', True, 1]),
+        ('ease', ['ease', 2.5, 'x']),
+        ('ease', ['ease', 2.5]),
+        ('created', ['created', 2.5, 1]),
+        ('due', ['due', 'not-a-date', 1]),
+        ('due', ['due', '2026-03-01T12:00:00', True]),
+    ],
+)
+def test_deck_endpoint_rejects_mistyped_cursor(client, headers, sort, key):
+    cursor = base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    response = client.get('/api/v1/cards', params={'sort': sort, 'cursor': cursor}, headers=headers)
+
+    assert response.status_code == 400
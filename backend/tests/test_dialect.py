@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+from app.core.dialect import day_start
+from app.models.entities import CardStatus, History, Schedule
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+
+
+def test_activity_groups_answers_by_day(db):
+    today = day_start(date.today())
+    for created_at in (today + timedelta(hours=1), today + timedelta(hours=20), today - timedelta(hours=1)):
+        db.add(History(username='alice', card_id='c1', answer=True, created_at=created_at))
+    db.commit()
+
+    activity = HistoryRepo(db).get_activity_data('alice', days=7)
+
+    assert [tuple(row) for row in activity] == [
+        (str(date.today() - timedelta(days=1)), 1),
+        (str(date.today()), 2),
+    ]
+
+
+def test_due_chart_counts_due_cards_by_day(db):
+    tomorrow = day_start(date.today() + timedelta(days=1))
+    for i, (due, status) in enumerate(
+        [
+            (tomorrow + timedelta(hours=3), CardStatus.DUE),
+            (tomorrow + timedelta(hours=23), CardStatus.DUE),
+            (tomorrow + timedelta(hours=5), CardStatus.CRAM),
+            (datetime.now() + timedelta(days=90), CardStatus.DUE),
+        ]
+    ):
+        db.add(Schedule(username='alice', card_id=f'c{i}', due=due, interval_min=10, status=status))
+    db.commit()
+
+    chart = ScheduleRepo(db).get_due_chart('alice', days=30)
+
+    assert [tuple(row) for row in chart] == [(str(tomorrow.date()), 2)]
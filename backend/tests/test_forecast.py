@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.models.entities import CardStatus
+from app.repositories.schedule import ScheduleRepo
+from app.services.forecast import load_deck
+from app.services.scheduler import STATUS_CODES
+
+
+def test_scheduling_state_reads_due_in_minutes(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['a', 'b'], 'alice')
+    schedule_repo.add_card('x', 'bob')
+    now = datetime(2026, 3, 1, 12, 0)
+    schedule = schedule_repo.get_schedule('a', 'alice')
+    schedule.status, schedule.interval_min, schedule.due = CardStatus.DUE, 1440, now + timedelta(hours=1, seconds=30)
+    schedule_repo.update_schedule(schedule, CardStatus.NEW)
+
+    rows = sorted(schedule_repo.get_scheduling_state('alice', now), key=lambda row: row[0])
+    assert [(row[0], row[1]) for row in rows] == [('DUE', 1440), ('NEW', None)]
+    assert rows[0][3] == pytest.approx(60.5, abs=1e-3)
+    assert rows[1][3] is None
+
+
+def test_scheduling_state_reads_only_the_covering_index(sqlite_engine):
+    statements = []
+    event.listen(sqlite_engine, 'before_cursor_execute', lambda *args: statements.append(args[2:4]))
+    with Session(sqlite_engine) as db:
+        ScheduleRepo(db).get_scheduling_state('alice', datetime.now())
+        statement, parameters = statements[-1]
+        plan = db.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+
+    assert [row[-1] for row in plan] == [
+        'SEARCH schedule USING COVERING INDEX ix_schedule_username_status_due_interval_min_ease (username=?)'
+    ]
+
+
+def test_load_deck_turns_missing_values_into_nan():
+    deck = load_deck([('DUE', 1440, 2.5, -30.0), ('NEW', None, 2.5, None)])
+
+    assert deck.status.tolist() == [STATUS_CODES[CardStatus.DUE], STATUS_CODES[CardStatus.NEW]]
+    assert deck.interval.tolist() == [1440.0, 0.0]
+    assert deck.ease.tolist() == [2.5, 2.5]
+    assert deck.due[0] == -30.0 and np.isnan(deck.due[1])
+    assert load_deck([]).status.size == 0
+
+
+def test_forecast_endpoint_counts_new_cards(client, headers):
+    for word in ('apple', 'pear'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+
+    data = client.get('/api/v1/stats/forecast', params={'days': 3}, headers=headers).json()
+
+    assert len(data) == 3
+    assert sum(day['new'] for day in data) == 2
+    assert data[0]['reviews'] > 0
@@ -0,0 +1,24 @@
+import pytest
+
+import main
+from app.services import warmup
+
+
+def test_ready_after_warmup(client):
+    response = client.get('/health/ready')
+    assert (response.status_code, response.json()['status']) == (200, 'ready')
+
+
+@pytest.mark.skipif(not main.frontend_dist.exists(), reason='frontend is not built')
+def test_stale_manifest_entry_falls_back_to_index(client, tmp_path, monkeypatch):
+    asset = tmp_path / 'app.js'
+    asset.write_text('console.log(1)')
+    monkeypatch.setattr(warmup, 'frontend_manifest', {'app.js': asset, 'old.js': tmp_path / 'old.js'})
+
+    assert client.get('/app.js').text == 'console.log(1)'
+
+    # Файл удалён повторной сборкой: вместо 500 — index.html, запись выброшена
+    response = client.get('/old.js')
+    assert response.status_code == 200
+    assert response.text == (main.frontend_dist / 'index.html').read_text()
+    assert warmup.frontend_manifest == {'app.js': asset}
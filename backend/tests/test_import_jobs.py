@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from app.models.entities import ImportJobStatus, ImportWordStatus
+from app.repositories.jobs import ImportJobsRepo
+from app.repositories.reverso import ReversoRepo
+from app.repositories.schedule import ScheduleRepo
+from app.services import import_jobs
+from conftest import StaticDefinitionsProvider
+
+
+class FlakyProvider(StaticDefinitionsProvider):
+    """Первые failures обращений к словам из flaky отвечают как недоступный Reverso."""
+
+    def __init__(self, flaky: set[str], failures: int, status_code: int = 503, **kwargs):
+        super().__init__(**kwargs)
+        self.flaky, self.failures, self.status_code = flaky, failures, status_code
+
+    def get_definitions(self, word: str) -> list[dict]:
+        if word in self.flaky and self.failures > 0:
+            self.failures -= 1
+            self.calls.append(word)
+            raise HTTPException(status_code=self.status_code, detail='Reverso is unavailable')
+        return super().get_definitions(word)
+
+
+@pytest.fixture
+def run_job(engine, monkeypatch):
+    monkeypatch.setattr(import_jobs, 'engine', engine)
+    monkeypatch.setattr(import_jobs, 'backoff_delay', lambda *args, **kwargs: 0)
+    # Остановка приложения в тестах API выставляет флаг; задания здесь запускаются напрямую
+    import_jobs._stop.clear()
+
+    def run(provider, words: list[str]) -> str:
+        monkeypatch.setattr(import_jobs, 'build_reverso_repo', lambda: ReversoRepo(provider))
+        with Session(engine) as db:
+            job_id = ImportJobsRepo(db).create_job('alice', words).id
+        import_jobs._run_import_job(job_id)
+        return job_id
+
+    return run
+
+
+def _word_statuses(engine, job_id: str) -> dict[str, ImportWordStatus]:
+    with Session(engine) as db:
+        return {item.word: item.status for item in ImportJobsRepo(db).get_words(job_id)}
+
+
+@pytest.mark.parametrize('status_code', [502, 503])
+def test_upstream_errors_are_retried_not_failed(engine, run_job, status_code):
+    provider = FlakyProvider({'pear'}, failures=2, status_code=status_code, missing={'qwzx'})
+
+    job_id = run_job(provider, ['apple', 'pear', 'qwzx'])
+
+    assert _word_statuses(engine, job_id) == {
+        'apple': ImportWordStatus.ADDED,
+        'pear': ImportWordStatus.ADDED,
+        'qwzx': ImportWordStatus.FAILED,
+    }
+    assert provider.calls == ['apple', 'pear', 'pear', 'pear', 'qwzx']
+    with Session(engine) as db:
+        job = ImportJobsRepo(db).get_job(job_id)
+        assert (job.status, job.processed) == (ImportJobStatus.DONE, 3)
+        assert ScheduleRepo(db).get_amount('alice').new == 2
+
+
+def test_shutdown_leaves_unavailable_words_pending(engine, run_job):
+    provider = FlakyProvider({'pear'}, failures=100)
+    import_jobs._stop.set()
+    try:
+        job_id = run_job(provider, ['apple', 'pear', 'plum'])
+    finally:
+        import_jobs._stop.clear()
+
+    assert _word_statuses(engine, job_id) == {
+        'apple': ImportWordStatus.ADDED,
+        'pear': ImportWordStatus.PENDING,
+        'plum': ImportWordStatus.PENDING,
+    }
+    with Session(engine) as db:
+        assert ImportJobsRepo(db).get_job(job_id).status == ImportJobStatus.RUNNING
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from sqlmodel import Session
+
+from app.models.entities import CardStatus
+from app.models.user import User
+from app.repositories.schedule import ScheduleRepo
+
+USER = User(username='alice', new_limit=20, due_limit=200)
+
+
+def test_limits_default_to_user_settings_and_follow_updates(db):
+    schedule_repo = ScheduleRepo(db)
+    assert (schedule_repo.get_limits(USER).new_limit, schedule_repo.get_limits(USER).due_limit) == (20, 200)
+
+    schedule_repo.update_limits(USER, CardStatus.NEW, -1)
+    schedule_repo.update_limits(USER, CardStatus.DUE, 10)
+
+    limits = schedule_repo.get_limits(USER)
+    assert (limits.new_limit, limits.due_limit) == (19, 210)
+
+
+def test_cache_miss_does_not_overwrite_newer_update(engine, monkeypatch):
+    with Session(engine) as reader, Session(engine) as writer:
+        real_exec = reader.exec
+
+        def exec_racing_with_update(*args, **kwargs):
+            # Запрос прочитал ещё старые лимиты, и до записи в кэш другой запрос успевает их изменить
+            stale = real_exec(*args, **kwargs).first()
+            ScheduleRepo(writer).update_limits(USER, CardStatus.NEW, 5)
+            return SimpleNamespace(first=lambda: stale)
+
+        monkeypatch.setattr(reader, 'exec', exec_racing_with_update)
+        assert ScheduleRepo(reader).get_limits(USER).new_limit == 25
+        monkeypatch.undo()
+
+        assert ScheduleRepo(reader).get_limits(USER).new_limit == 25
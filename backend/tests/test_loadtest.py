@@ -0,0 +1,33 @@
+import random
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.repositories.reverso import HTTPDefinitionsProvider
+from benchmarks.deck import make_reverso_payload
+from loadtest.fake_reverso import FakeReversoServer
+
+
+@pytest.fixture
+def fake_reverso(monkeypatch):
+    server = FakeReversoServer(0, latency_ms=0, jitter_ms=0, error_rate=0, hang_rate=0)
+    server.start_in_background()
+    monkeypatch.setattr(settings, 'REVERSO_URL', server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fake_reverso_serves_deterministic_payloads(fake_reverso):
+    with httpx.Client() as client:
+        provider = HTTPDefinitionsProvider(client)
+        first, second = provider.get_definitions('apple'), provider.get_definitions('apple')
+    assert first == second == make_reverso_payload(random.Random('apple'), 'apple')
+    assert fake_reverso.requests == 2
+
+
+def test_fake_reverso_injects_errors(fake_reverso):
+    fake_reverso.error_rate = 1.0
+    with httpx.Client() as client:
+        assert client.get(f'{fake_reverso.url}/en/apple').status_code in (429, 500, 502, 503)
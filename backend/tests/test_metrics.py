@@ -0,0 +1,38 @@
+import asyncio
+
+from starlette.routing import Route
+
+from app.core import metrics
+
+
+def test_requests_are_labelled_by_route_template(client, headers):
+    jobs = ('GET', '/api/v1/cards/jobs/{job_id}', '404')
+    card = ('GET', '/api/v1/cards/{card_id}', '404')
+    before = {key: metrics.http_requests._values.get(key, 0) for key in (jobs, card)}
+
+    # Значение параметра совпадает с литеральной частью пути: подстановкой строки шаблон не восстановить
+    client.get('/api/v1/cards/jobs/jobs', headers=headers)
+    client.get('/api/v1/cards/missing', headers=headers)
+
+    assert {key: metrics.http_requests._values.get(key, 0) - before[key] for key in (jobs, card)} == {jobs: 1, card: 1}
+    text = client.get('/metrics').text
+    assert 'route="/api/v1/cards/jobs/{job_id}"' in text
+    assert '/api/v1/cards/missing' not in text and '/api/v1/cards/jobs/jobs' not in text
+
+
+def test_latency_stops_when_response_is_sent():
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok', 'more_body': False})
+        # Фоновая задача после ответа
+        await asyncio.sleep(0.2)
+
+    async def send(message):
+        pass
+
+    route = Route('/test/background/{item}', app)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/test/background/1', 'route': route}
+    asyncio.run(metrics.MetricsMiddleware(app)(scope, None, send))
+
+    _, total, count = metrics.http_latency._values[('GET', '/test/background/{item}')]
+    assert count == 1 and total < 0.1
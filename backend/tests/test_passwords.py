@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.core import passwords
+from app.core.config import settings
+from app.core.security import hash_password
+from conftest import PASSWORD
+
+
+@pytest.fixture
+def password_pool():
+    passwords.start_password_pool()
+    yield
+    passwords.shutdown_password_pool()
+
+
+def test_pool_checks_passwords_and_frees_slots(password_pool):
+    hashed = hash_password('secret')
+
+    async def check_all() -> list[bool]:
+        results = await asyncio.gather(
+            passwords.verify_password_async('secret', hashed),
+            passwords.verify_password_async('wrong', hashed),
+            passwords.verify_password_async('secret', 'not-a-bcrypt-hash'),
+        )
+        # Слоты освобождаются колбэком через event loop
+        await asyncio.sleep(0)
+        return list(results)
+
+    assert asyncio.run(check_all()) == [True, False, False]
+    assert passwords._in_flight == 0
+
+
+def test_release_after_loop_is_closed_is_ignored(monkeypatch):
+    monkeypatch.setattr(passwords, '_in_flight', 1)
+    loop = asyncio.new_event_loop()
+    loop.close()
+
+    passwords._release_from(loop)
+
+    # Колбэк не запланирован и не выполнен: исключения нет, слот не освобождён
+    assert passwords._in_flight == 1
+
+
+def test_login_is_rejected_when_pool_is_saturated(client, monkeypatch):
+    monkeypatch.setattr(passwords, '_in_flight', settings.PASSWORD_WORKERS + settings.PASSWORD_QUEUE_LIMIT)
+
+    response = client.post('/api/v1/auth/login', data={'username': 'alice', 'password': PASSWORD})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
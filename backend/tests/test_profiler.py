@@ -0,0 +1,42 @@
+import asyncio
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core import profiler
+from app.core.config import settings
+
+
+def test_profiler_counts_statements_and_flags_repeats(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(settings, 'SQL_PROFILER_HEADERS', True)
+    monkeypatch.setattr(settings, 'SQL_REPEAT_THRESHOLD', 3)
+    monkeypatch.setattr(settings, 'SQL_SLOW_QUERY_MS', 0.0)
+    engine = create_engine(f'sqlite:///{tmp_path / "profiler.db"}')
+    profiler.instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE item (id INTEGER PRIMARY KEY)'))
+
+    async def app(scope, receive, send):
+        # N+1: одно и то же выражение на каждый элемент
+        with engine.connect() as conn:
+            for item_id in range(5):
+                conn.execute(text('SELECT id FROM item WHERE id = :id'), {'id': item_id})
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/items'}
+    with caplog.at_level(logging.WARNING, logger=profiler.__name__):
+        asyncio.run(profiler.SQLProfilerMiddleware(app)(scope, None, send))
+
+    assert dict(messages[0]['headers'])[b'x-sql-queries'] == b'5'
+    shape = 'SELECT id FROM item WHERE id = ?'
+    assert profiler.summary()['repeated'][-1] == {'method': 'GET', 'path': '/items', 'statements': {shape: 5}}
+    assert next(item for item in profiler.summary()['statements'] if item['statement'] == shape)['count'] == 5
+    # Медленный запрос логируется вместе с планом
+    assert any('Медленный SQL-запрос' in record.message and 'План' in record.message for record in caplog.records)
+    engine.dispose()
@@ -0,0 +1,30 @@
+import csv
+import io
+
+from app.api.v1 import backup
+from app.core.security import create_access_token
+
+
+def test_export_streams_only_own_schedules_and_cards(client, headers, monkeypatch):
+    monkeypatch.setattr(backup, '_EXPORT_CHUNK_ROWS', 1)
+    for word in ('apple', 'pear'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+    bob = {'Authorization': f'Bearer {create_access_token("bob")}'}
+    client.post('/api/v1/cards/create', params={'word': 'plum'}, headers=bob)
+
+    rows = list(csv.reader(io.StringIO(client.get('/api/v1/backup/export', headers=headers).text)))
+
+    cards_at = rows.index(['# CARDS'])
+    schedules, cards = rows[2 : cards_at - 1], rows[cards_at + 2 :]
+    assert [(row[1], row[6]) for row in schedules] == [('alice', 'N'), ('alice', 'N')]
+    assert sorted(row[1] for row in cards) == ['apple', 'pear']
+    assert {row[2] for row in schedules} == {row[0] for row in cards}
+
+
+def test_hardest_cards_are_returned_with_ease(client, headers):
+    client.post('/api/v1/cards/create', params={'word': 'apple'}, headers=headers)
+
+    [hardest] = client.get('/api/v1/stats/hardest', headers=headers).json()
+
+    assert (hardest['card']['word'], hardest['ease']) == ('apple', 2.5)
+    assert hardest['card']['translation'] == 'apple-ru'
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from app.models.entities import CardStatus, History
+from app.models.user import User
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+from app.services.replay import replay_user
+from app.services.scheduler import MAX_INTERVAL_MIN
+
+
+def _answer(db, card_id: str, correct: bool, minutes_ago: int) -> None:
+    created_at = datetime.now() - timedelta(minutes=minutes_ago)
+    db.add(History(username='alice', card_id=card_id, answer=correct, created_at=created_at))
+
+
+def test_replay_rewrites_schedules_from_history(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['kept', 'fresh'], 'alice')
+    for minutes_ago, correct in [(30, True), (20, True)]:
+        _answer(db, 'kept', correct, minutes_ago)
+    db.commit()
+
+    result = replay_user(User(username='alice'), HistoryRepo(db), schedule_repo)
+
+    kept = schedule_repo.get_schedule('kept', 'alice')
+    assert (result.cards, kept.interval_min, kept.status) == (1, 60 * 24, CardStatus.DUE)
+    assert schedule_repo.get_schedule('fresh', 'alice').status == CardStatus.NEW
+    assert schedule_repo.get_amount('alice').model_dump() == {'new': 1, 'cram': 0, 'due': 0}
+
+
+def test_replay_survives_long_runs_of_correct_answers(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_card('learned', 'alice')
+    # Без потолка срок уходит за пределы datetime уже на 14-м ответе
+    for minutes_ago in range(200, 0, -1):
+        _answer(db, 'learned', True, minutes_ago)
+    db.commit()
+
+    replay_user(User(username='alice'), HistoryRepo(db), schedule_repo)
+
+    learned = schedule_repo.get_schedule('learned', 'alice')
+    assert (learned.interval_min, learned.status) == (MAX_INTERVAL_MIN, CardStatus.DUE)
+    assert learned.due.year > datetime.now().year + 90
+
+
+def test_replay_keeps_tombstones_of_deleted_cards(db):
+    schedule_repo = ScheduleRepo(db)
+    schedule_repo.add_cards(['kept', 'gone'], 'alice')
+    for card_id in ('kept', 'gone'):
+        _answer(db, card_id, True, 5)
+    db.commit()
+    schedule_repo.delete_schedule('gone', 'alice')
+
+    replay_user(User(username='alice'), HistoryRepo(db), schedule_repo)
+
+    changes, _ = schedule_repo.get_changes('alice', 0, 10)
+    assert {change.card_id: change.deleted for change in changes} == {'kept': False, 'gone': True}
+    assert schedule_repo.get_schedule('gone', 'alice') is None
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.resilience import CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket
+from app.repositories import reverso
+from app.repositories.reverso import HTTPDefinitionsProvider
+
+RESET = 0.05
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET)
+    monkeypatch.setattr(reverso, '_breaker', breaker)
+    monkeypatch.setattr(reverso, '_rate_limiter', TokenBucket(rate=1000, burst=1000))
+    monkeypatch.setattr(settings, 'REVERSO_RETRIES', 0)
+    return breaker
+
+
+def _provider(handler) -> HTTPDefinitionsProvider:
+    return HTTPDefinitionsProvider(httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def _ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={'DefsByWord': [{'word': 'apple'}]})
+
+
+def test_breaker_opens_and_recovers_through_probe(breaker):
+    with pytest.raises(HTTPException) as failed:
+        _provider(lambda request: httpx.Response(500)).get_definitions('apple')
+    assert (failed.value.status_code, breaker.state) == (502, CircuitBreaker.OPEN)
+
+    with pytest.raises(HTTPException) as rejected:
+        _provider(_ok).get_definitions('apple')
+    assert rejected.value.status_code == 503
+
+    time.sleep(RESET)
+    assert _provider(_ok).get_definitions('apple') == [{'word': 'apple'}]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_error_in_probe_does_not_leave_breaker_half_open(breaker):
+    with pytest.raises(HTTPException):
+        _provider(lambda request: httpx.Response(503)).get_definitions('apple')
+    time.sleep(RESET)
+
+    def broken(request: httpx.Request) -> httpx.Response:
+        raise RuntimeError('bug in transport')
+
+    with pytest.raises(RuntimeError):
+        _provider(broken).get_definitions('apple')
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Проба завершена: после таймаута размыкатель снова пропускает вызов
+    time.sleep(RESET)
+    assert _provider(_ok).get_definitions('apple') == [{'word': 'apple'}]
+
+
+def test_non_object_body_is_an_upstream_failure(breaker):
+    with pytest.raises(HTTPException) as failed:
+        _provider(lambda request: httpx.Response(200, json=['not', 'an', 'object'])).get_definitions('apple')
+    assert failed.value.status_code == 502
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=RESET)
+    breaker.on_failure()
+    breaker.before_call()
+    breaker.on_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(RESET)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    breaker.on_success()
+    assert (breaker.state, breaker.failures) == (CircuitBreaker.CLOSED, 0)
+
+
+def test_counters_do_not_lose_increments_across_threads():
+    before = reverso.reverso_status()['calls']
+
+    def bump():
+        for _ in range(20_000):
+            reverso._count('calls')
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert reverso.reverso_status()['calls'] - before == 80_000
+
+
+def test_single_flight_shares_one_call():
+    single_flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return 'value'
+
+    leader = threading.Thread(target=lambda: results.append(single_flight.do('apple', slow)))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=lambda: results.append(single_flight.do('apple', slow)))
+    follower.start()
+    while single_flight.coalesced == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert (calls, results, single_flight.coalesced) == ([1], ['value', 'value'], 1)
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
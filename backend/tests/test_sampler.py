@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from app.core import sampler
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collects_stacks_of_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name='busy')
+    worker.start()
+    try:
+        stacks = sampler.sample(0.1, 0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    busy = [stack for stack in stacks if stack[0] == 'busy']
+    assert busy and all(stack[-1].startswith('_busy_loop (') for stack in busy)
+    assert '_busy_loop (' in sampler.to_collapsed(stacks)
+
+    profile = next(item for item in sampler.to_speedscope(stacks, 0.005)['profiles'] if item['name'] == 'busy')
+    assert profile['endValue'] == pytest.approx(sum(stacks[stack] for stack in busy) * 0.005)
+
+
+def test_only_one_session_at_a_time():
+    started = threading.Event()
+    session = threading.Thread(target=lambda: (started.set(), sampler.sample(0.2, 0.01)))
+    session.start()
+    started.wait()
+    while not sampler._running.locked():
+        pass
+    with pytest.raises(sampler.ProfilerBusyError):
+        sampler.sample(0.01, 0.01)
+    session.join()
+
+
+def test_profile_endpoint_requires_admin(client, headers):
+    assert client.get('/api/v1/debug/profile', params={'seconds': 1}, headers=headers).status_code == 403
@@ -0,0 +1,66 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.models.entities import CardStatus
+from app.services.scheduler import (
+    INITIAL_EASE,
+    MAX_INTERVAL_MIN,
+    MINUTES_PER_DAY,
+    STATUS_CODES,
+    STATUSES,
+    ScheduleState,
+    next_state,
+    replay,
+    step,
+)
+
+BONUS, PUNISHMENT = 1.05, 0.8
+
+
+@pytest.mark.parametrize(
+    'interval_min, status, correct',
+    itertools.product([None, 1, 10, 25, MINUTES_PER_DAY, 3 * MINUTES_PER_DAY], list(CardStatus), [True, False]),
+)
+def test_step_matches_next_state(interval_min, status, correct):
+    expected = next_state(ScheduleState(interval_min, 2.3, status), correct, BONUS, PUNISHMENT)
+
+    interval, ease, codes = step(
+        np.array([interval_min or 0]),
+        np.array([2.3]),
+        np.array([STATUS_CODES[status]], dtype=np.int8),
+        np.array([correct]),
+        BONUS,
+        PUNISHMENT,
+    )
+
+    assert (int(interval[0]), STATUSES[codes[0]]) == (expected.interval_min, expected.status)
+    assert ease[0] == pytest.approx(expected.ease)
+
+
+def test_replay_matches_answer_by_answer():
+    rng = np.random.default_rng(1)
+    lengths = rng.integers(1, 12, size=50)
+    answers = rng.random(int(lengths.sum())) < 0.8
+
+    interval, ease, status = replay(answers, lengths, BONUS, PUNISHMENT)
+
+    offset = 0
+    for i, length in enumerate(lengths):
+        state = ScheduleState(None, INITIAL_EASE, CardStatus.NEW)
+        for correct in answers[offset : offset + length]:
+            state = next_state(state, bool(correct), BONUS, PUNISHMENT)
+        offset += length
+        assert (int(interval[i]), STATUSES[status[i]]) == (state.interval_min, state.status)
+        assert ease[i] == pytest.approx(state.ease)
+
+
+def test_interval_is_capped_on_long_correct_runs():
+    state = ScheduleState(None, INITIAL_EASE, CardStatus.NEW)
+    for _ in range(100):
+        state = next_state(state, True, BONUS, PUNISHMENT)
+
+    interval, _, _ = replay(np.ones(100, dtype=bool), np.array([100]), BONUS, PUNISHMENT)
+
+    assert state.interval_min == int(interval[0]) == MAX_INTERVAL_MIN
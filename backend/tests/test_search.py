@@ -0,0 +1,97 @@
+import base64
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.database import init_card_search
+from app.repositories.cards import CardsRepo
+from app.repositories.schedule import ScheduleRepo
+from conftest import make_card
+
+
+def _add(db, *words: str) -> None:
+    CardsRepo(db).create_cards([make_card(f'id-{word}', word) for word in words])
+    ScheduleRepo(db).add_cards([f'id-{word}' for word in words], 'alice')
+
+
+def _search(db, query: str) -> list[str]:
+    return [card.word for card, _ in CardsRepo(db).search_cards('alice', query, limit=10)]
+
+
+def test_search_matches_prefixes_of_own_cards(db):
+    _add(db, 'apple', 'apricot', 'banana')
+    CardsRepo(db).create_card(make_card('id-applet', 'applet'))
+
+    assert sorted(_search(db, 'ap')) == ['apple', 'apricot']
+    assert _search(db, 'banana') == ['banana']
+
+
+def test_search_endpoint_follows_cursor(client, headers):
+    for word in ('apple', 'apricot', 'banana'):
+        client.post('/api/v1/cards/create', params={'word': word}, headers=headers)
+
+    words, cursor = [], None
+    while True:
+        params = {'q': 'ap', 'limit': 1, **({'cursor': cursor} if cursor else {})}
+        page = client.get('/api/v1/cards/search', params=params, headers=headers).json()
+        words += [card['word'] for card in page['cards']]
+        if not (cursor := page['next_cursor']):
+            break
+
+    assert sorted(words) == ['apple', 'apricot']
+
+
+@pytest.mark.parametrize('key', [[1], [1.5, 2], ['rank', 'id'], [True, 'id'], [1.5, 'id', 'extra'], {'rank': 1}, 7])
+def test_search_rejects_malformed_cursor(client, headers, key):
+    cursor = base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    response = client.get('/api/v1/cards/search', params={'q': 'ap', 'cursor': cursor}, headers=headers)
+
+    assert response.status_code == 400
+
+
+def test_search_survives_vacuum_after_deletes(sqlite_engine):
+    with Session(sqlite_engine) as db:
+        _add(db, 'alpha', 'beta', 'gamma', 'delta')
+        cards_repo = CardsRepo(db)
+        cards_repo.delete_card('id-alpha')
+        ScheduleRepo(db).delete_schedules('alice', ['id-beta'])
+        assert cards_repo.delete_orphan_cards(['id-beta']) == 1
+
+    with sqlite_engine.connect() as conn:
+        conn.execute(text('VACUUM'))
+        assert conn.execute(text('SELECT count(*) FROM card_fts')).scalar() == 2
+        assert conn.execute(text('SELECT count(*) FROM card_search')).scalar() == 2
+
+    with Session(sqlite_engine) as db:
+        _add(db, 'alpha')
+        assert [_search(db, word) for word in ('alpha', 'beta', 'gamma', 'delta')] == [
+            ['alpha'],
+            [],
+            ['gamma'],
+            ['delta'],
+        ]
+
+
+def test_legacy_rowid_index_is_rebuilt(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "legacy.db"}')
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text("CREATE VIRTUAL TABLE card_fts USING fts5(word, translation, content='card', content_rowid='rowid')")
+        )
+        conn.execute(text('CREATE TRIGGER card_fts_ad AFTER DELETE ON card BEGIN SELECT 1; END'))
+    with Session(engine) as db:
+        CardsRepo(db).create_card(make_card('id-apple', 'apple'))
+        ScheduleRepo(db).add_card('id-apple', 'alice')
+
+    init_card_search(engine)
+
+    with Session(engine) as db:
+        assert _search(db, 'apple') == ['apple']
+    with engine.connect() as conn:
+        triggers = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars().all()
+    assert sorted(triggers) == ['card_fts_ad', 'card_fts_ai']
+    engine.dispose()
@@ -0,0 +1,22 @@
+from app.repositories.reverso import ChainDefinitionsProvider, ReversoRepo, SnapshotDefinitionsProvider
+from conftest import StaticDefinitionsProvider
+
+
+def test_snapshot_answers_known_words_without_network(tmp_path):
+    path = tmp_path / 'snapshot.db'
+    writer = SnapshotDefinitionsProvider(path, writable=True)
+    writer.store(' Apple ', StaticDefinitionsProvider().get_definitions('apple'))
+    writer.commit()
+
+    snapshot = SnapshotDefinitionsProvider(path)
+    network = StaticDefinitionsProvider()
+    repo = ReversoRepo(ChainDefinitionsProvider([snapshot, network]))
+
+    [card] = repo.get_cards('APPLE')
+    assert (card.word, card.translation) == ('apple', 'apple-ru')
+    assert network.calls == []
+    assert snapshot.words() == ['apple']
+
+    # Слова нет в снимке: запрос уходит в следующий источник
+    assert [card.word for card in repo.get_cards('pear')] == ['pear']
+    assert network.calls == ['pear']
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from app.models.entities import CardStatus, History
+from app.repositories.history import HistoryRepo
+from app.repositories.schedule import ScheduleRepo
+
+
+def _set(schedule_repo: ScheduleRepo, card_id: str, username: str, status: CardStatus, due: datetime) -> None:
+    schedule = schedule_repo.get_schedule(card_id, username)
+    schedule.status, schedule.interval_min, schedule.due = status, 10, due
+    schedule_repo.update_schedule(schedule, CardStatus.NEW)
+
+
+def test_prepared_pickers_bind_user_and_time(db):
+    """Собранные при импорте запросы каждый раз получают свои параметры: пользователя и текущие границы дня."""
+    schedule_repo = ScheduleRepo(db)
+    now = datetime.now()
+    schedule_repo.add_cards(['cram-late', 'cram-early', 'due-today', 'due-later', 'new'], 'alice')
+    schedule_repo.add_cards(['bob-cram', 'bob-due'], 'bob')
+    _set(schedule_repo, 'cram-late', 'alice', CardStatus.CRAM, now + timedelta(minutes=5))
+    _set(schedule_repo, 'cram-early', 'alice', CardStatus.CRAM, now - timedelta(minutes=5))
+    _set(schedule_repo, 'due-today', 'alice', CardStatus.DUE, now - timedelta(hours=1))
+    _set(schedule_repo, 'due-later', 'alice', CardStatus.DUE, now + timedelta(days=3))
+    _set(schedule_repo, 'bob-cram', 'bob', CardStatus.CRAM, now - timedelta(hours=1))
+    _set(schedule_repo, 'bob-due', 'bob', CardStatus.DUE, now - timedelta(hours=2))
+
+    assert schedule_repo.get_cram('alice').card_id == 'cram-early'
+    assert schedule_repo.get_due('alice').card_id == 'due-today'
+    assert schedule_repo.get_new('alice').card_id == 'new'
+    assert schedule_repo.get_due_amount('alice') == 1
+    assert (schedule_repo.get_cram('bob').card_id, schedule_repo.get_due('bob').card_id) == ('bob-cram', 'bob-due')
+    assert schedule_repo.get_new('bob') is None
+    assert schedule_repo.get_schedule('new', 'bob') is None
+
+
+def test_today_stats_count_only_today(db):
+    history_repo = HistoryRepo(db)
+    yesterday = datetime.now() - timedelta(days=1)
+    for created_at in (yesterday, datetime.now()):
+        db.add(History(username='alice', card_id='a', answer=True, created_at=created_at))
+    db.add(History(username='bob', card_id='a', answer=True))
+    db.commit()
+
+    stats = history_repo.get_today_stats('alice')
+    assert stats['count'] == 1 and stats['first_time'].date() == datetime.now().date()
+    assert history_repo.get_today_stats('carol') == {'count': 0, 'first_time': None, 'last_time': None}
@@ -0,0 +1,41 @@
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.database import engine
+from app.core.security import create_access_token
+
+
+def _add_words(client, headers, *words: str) -> None:
+    for word in words:
+        assert client.post('/api/v1/cards/create', params={'word': word}, headers=headers).status_code == 200
+
+
+def test_session_answers_cards_and_reports_bad_messages(client, headers):
+    _add_words(client, headers, 'apple', 'pear')
+
+    with client.websocket_connect(f'/api/v1/study/session?token={create_access_token("alice")}') as ws:
+        card = ws.receive_json()['card']
+        assert card['word'] in ('apple', 'pear')
+
+        # Между сообщениями сессия не держит соединение из пула
+        assert engine.pool.checkedout() == 0
+
+        ws.send_text('{not json')
+        assert 'error' in ws.receive_json()
+        ws.send_json({'card_id': 'missing', 'answer': True})
+        assert ws.receive_json() == {'error': 'Schedule not found'}
+
+        ws.send_json({'card_id': card['id'], 'answer': True})
+        assert 'card' in ws.receive_json()
+        assert engine.pool.checkedout() == 0
+
+    stats = client.get('/api/v1/study/stats', headers=headers).json()
+    assert stats == {'new': 1, 'cram': 1, 'due': 0}
+
+
+def test_session_rejects_bad_token(client):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect('/api/v1/study/session?token=bad'):
+            pass
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION